@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+OMEGA6 Kernel Builder
+Ahead-of-time compiles the audio kernels into src/omega6_kernels, so startup needs no JIT
+"""
+
+import sys
+from pathlib import Path
+
+from numba.pycc import CC
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from src.audio_kernels import (  # noqa: E402
+    FRAME_FEATURES_SIGNATURE,
+    RMS_PEAK_SIGNATURE_1D,
+    RMS_PEAK_SIGNATURE_2D,
+    WINDOW_BLOCK_SIGNATURE,
+    _frame_features_loop,
+    _rms_peak_loop,
+    _window_block_loop,
+)
+
+cc = CC("omega6_kernels")
+cc.output_dir = str(ROOT / "src")
+cc.export("window_block", WINDOW_BLOCK_SIGNATURE)(_window_block_loop)
+cc.export("rms_peak_1d", RMS_PEAK_SIGNATURE_1D)(_rms_peak_loop)
+cc.export("rms_peak_2d", RMS_PEAK_SIGNATURE_2D)(_rms_peak_loop)
+cc.export("frame_features", FRAME_FEATURES_SIGNATURE)(_frame_features_loop)
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built {cc.output_file} in {cc.output_dir}")
@@ -4,100 +4,290 @@ Code Quality Checker for OMEGA6
 Runs various linting and formatting tools
 """
 
+import argparse
 import os
+import pickle
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib import metadata
 from pathlib import Path
 
+try:
+    from blake3 import blake3 as content_hash
+except ImportError:
+    from hashlib import blake2b as content_hash
 
-def run_command(cmd: list, description: str) -> tuple[bool, str]:
-    """Run a command and return success status and output"""
+# Incremental cache of files that already passed a given tool
+CACHE_PATH = Path(".omega6_lint_cache.pickle")
+CACHE_TTL = 24 * 60 * 60  # seconds
+CACHE_MAX_ENTRIES = 2000
+CONFIG_FILES = ("pyproject.toml", ".flake8")
+
+# Directories never walked when collecting files (matches the tool exclude lists)
+EXCLUDED_DIRS = {"venv", ".venv", ".git", "__pycache__", "build", "dist", "friture_source"}
+
+
+class LintCache:
+    """Remembers which files passed which tool, keyed by file mtime/size and content"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict = {}
+        self._pending: dict = {}
+
+        try:
+            with open(path, "rb") as f:
+                self.entries = pickle.load(f)
+        except Exception:
+            self.entries = {}
+
+        # Drop expired entries
+        cutoff = time.time() - CACHE_TTL
+        self.entries = {k: v for k, v in self.entries.items() if v[3] >= cutoff}
+
+    @staticmethod
+    def tool_key(package: str) -> str:
+        """Identify a tool version and configuration, so upgrades invalidate entries"""
+        try:
+            version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            version = "unknown"
+
+        config = []
+        for name in CONFIG_FILES:
+            try:
+                st = os.stat(name)
+                config.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+            except OSError:
+                pass
+        return f"{package}=={version};" + ";".join(config)
+
+    @staticmethod
+    def _digest(path: str) -> bytes:
+        with open(path, "rb") as f:
+            digest: bytes = content_hash(f.read()).digest()
+        return digest
+
+    def changed_files(self, tool: str, files: list) -> list:
+        """Return the files that have not passed this tool in their current state"""
+        changed = []
+        for path in files:
+            key = (tool, path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                changed.append(path)
+                continue
+
+            entry = self.entries.get(key)
+            if entry is not None:
+                mtime_ns, size, digest, stored_at = entry
+                # Fast path: untouched file
+                if st.st_mtime_ns == mtime_ns and st.st_size == size:
+                    continue
+                # Slow path: touched but possibly unchanged content
+                if st.st_size == size and self._digest(path) == digest:
+                    self.entries[key] = (st.st_mtime_ns, size, digest, stored_at)
+                    continue
+
+            # Fingerprint now, so edits made while the tool runs are not marked clean
+            self._pending[key] = (st.st_mtime_ns, st.st_size, self._digest(path))
+            changed.append(path)
+
+        # Hand back the original list when nothing could be skipped
+        return files if len(changed) == len(files) else changed
+
+    def mark_passed(self, tool: str, files: list):
+        """Record that files passed a tool"""
+        now = time.time()
+        for path in files:
+            fingerprint = self._pending.pop((tool, path), None)
+            if fingerprint is not None:
+                self.entries[(tool, path)] = (*fingerprint, now)
+
+    def save(self):
+        """Write the cache atomically, evicting the oldest entries"""
+        if len(self.entries) > CACHE_MAX_ENTRIES:
+            newest = sorted(self.entries.items(), key=lambda item: item[1][3])
+            self.entries = dict(newest[-CACHE_MAX_ENTRIES:])
+
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save lint cache: {e}")
+
+
+def execute_command(cmd: list) -> tuple[bool, str, str]:
+    """Run a command and return success status, stdout and stderr"""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        return result.returncode == 0, result.stdout, result.stderr
+    except Exception as e:
+        return False, "", f"ERROR: {e}"
+
+
+def report_command(cmd: list, description: str, success: bool, stdout: str, stderr: str):
+    """Print the outcome of a finished command"""
     print(f"\n{'='*60}")
     print(f"Running: {description}")
     print(f"Command: {' '.join(cmd)}")
     print("=" * 60)
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✅ PASSED")
-            return True, result.stdout
-        else:
-            print("❌ FAILED")
-            print(result.stdout)
-            if result.stderr:
-                print(result.stderr)
-            return False, result.stdout + "\n" + result.stderr
-    except Exception as e:
-        print(f"❌ ERROR: {e}")
-        return False, str(e)
+    if success:
+        print("✅ PASSED")
+    else:
+        print("❌ FAILED")
+        print(stdout)
+        if stderr:
+            print(stderr)
 
 
-def main():
-    """Run all code quality checks"""
-    print("OMEGA6 Code Quality Check")
-    print("=" * 80)
+def run_command(cmd: list, description: str) -> tuple[bool, str]:
+    """Run a command and return success status and output"""
+    success, stdout, stderr = execute_command(cmd)
+    report_command(cmd, description, success, stdout, stderr)
+    if success:
+        return True, stdout
+    return False, stdout + "\n" + stderr
 
-    # Change to OMEGA6 directory
-    omega6_dir = Path(__file__).parent
-    os.chdir(omega6_dir)
 
-    # Ensure we're in virtual environment
-    if not os.environ.get("VIRTUAL_ENV"):
-        print("⚠️  Not in virtual environment. Please run: source venv/bin/activate")
-        return 1
+def run_checks(checks: list, jobs: int) -> dict:
+    """Run independent check commands concurrently, keyed by tool name"""
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {
+            executor.submit(execute_command, cmd): (name, cmd, description)
+            for name, cmd, description in checks
+        }
+        for future in as_completed(futures):
+            name, cmd, description = futures[future]
+            success, stdout, stderr = future.result()
+            report_command(cmd, description, success, stdout, stderr)
+            outcomes[name] = (success, stdout if success else stdout + "\n" + stderr)
+    return outcomes
 
-    # Define Python files to check
+
+def collect_python_files(root: str) -> list:
+    """Collect Python files in one walk of the tree, pruning excluded directories"""
     python_files = []
-    for pattern in ["*.py", "src/*.py", "plugins/*/*.py", "tests/*.py"]:
-        python_files.extend(Path(".").glob(pattern))
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d
+            for d in dirnames
+            if d not in EXCLUDED_DIRS and not d.startswith(".") and not d.endswith(".egg-info")
+        ]
+        for name in filenames:
+            if name.endswith(".py"):
+                python_files.append(os.path.normpath(os.path.join(dirpath, name)))
+    return sorted(python_files)
 
-    python_files = [str(f) for f in python_files if f.is_file()]
 
-    print(f"Found {len(python_files)} Python files to check")
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run OMEGA6 code quality checks")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="Number of checks to run concurrently (default: one per tool)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Check every file, ignoring results cached from previous runs",
+    )
+    parser.add_argument(
+        "--with-pylint",
+        action="store_true",
+        help="Also run Pylint (slow, informational only)",
+    )
+    return parser.parse_args()
 
-    # Run checks
-    results = []
 
-    # 1. Black formatting (auto-fix)
-    print("\n1. Running Black formatter...")
-    success, _ = run_command(["black", "--check", "--diff"] + python_files, "Black (checking)")
+# These tools walk "." themselves and honor the excludes in pyproject.toml/.flake8,
+# so only pass explicit paths when checking a subset. Pylint always gets the list.
+TREE_AWARE_TOOLS = {"Black", "isort", "Flake8", "MyPy"}
 
-    if not success:
-        print("   Applying Black formatting...")
-        run_command(["black"] + python_files, "Black (fixing)")
-        results.append(("Black", True, "Formatted"))
-    else:
-        results.append(("Black", True, "Already formatted"))
 
-    # 2. isort import sorting (auto-fix)
-    print("\n2. Running isort...")
-    success, _ = run_command(["isort", "--check-only", "--diff"] + python_files, "isort (checking)")
+def check_targets(name: str, files: list, python_files: list) -> list:
+    """Command line paths for a tool checking files"""
+    if name in TREE_AWARE_TOOLS and files is python_files:
+        return ["."]
+    return files
 
-    if not success:
-        print("   Applying isort fixes...")
-        run_command(["isort"] + python_files, "isort (fixing)")
-        results.append(("isort", True, "Fixed imports"))
-    else:
-        results.append(("isort", True, "Imports already sorted"))
+
+def plan_checks(tools: list, python_files: list, cache) -> tuple:
+    """Build the check commands, skipping files that already passed a tool unchanged"""
+    tool_files = {}
+    tool_keys = {}
+    checks = []
+    for name, package, cmd, description, cacheable in tools:
+        files = python_files
+        if cache is not None and cacheable:
+            tool_keys[name] = cache.tool_key(package)
+            files = cache.changed_files(tool_keys[name], python_files)
+        tool_files[name] = files
+
+        if files:
+            checks.append((name, cmd + check_targets(name, files, python_files), description))
+        else:
+            print(f"{description}: all files unchanged, skipping")
+    return checks, tool_files, tool_keys
+
+
+def apply_fix(name: str, outcomes: dict, files: list, python_files: list, messages) -> tuple:
+    """Run a formatter in fixing mode if its check failed; messages are (fixed, clean)"""
+    success, _ = outcomes[name]
+    if success:
+        return (name, True, messages[1])
+    print(f"\n   Applying {name} fixes...")
+    run_command([name.lower()] + check_targets(name, files, python_files), f"{name} (fixing)")
+    return (name, True, messages[0])
+
+
+def collect_results(outcomes: dict, tool_files: dict, python_files: list, with_pylint: bool):
+    """Apply the auto-fixes and turn check outcomes into (tool, passed, message) rows"""
+    # 1. Black formatting and 2. isort import sorting (auto-fix)
+    # Fixes run serially afterwards so the formatters never race on the same files.
+    # They rewrite files, so their results are never cached.
+    results = [
+        apply_fix(
+            "Black", outcomes, tool_files["Black"], python_files, ("Formatted", "Already formatted")
+        ),
+        apply_fix(
+            "isort",
+            outcomes,
+            tool_files["isort"],
+            python_files,
+            ("Fixed imports", "Imports already sorted"),
+        ),
+    ]
 
     # 3. Flake8 linting
-    print("\n3. Running Flake8...")
-    success, output = run_command(["flake8", "--statistics", "--count"] + python_files, "Flake8")
+    success, output = outcomes["Flake8"]
     results.append(("Flake8", success, output.strip() if not success else "No issues"))
 
     # 4. MyPy type checking
-    print("\n4. Running MyPy...")
-    success, output = run_command(["mypy", "--no-error-summary"] + python_files, "MyPy")
+    success, output = outcomes["MyPy"]
     results.append(("MyPy", success, "Type checking passed" if success else output.strip()))
 
     # 5. Pylint (informational only)
-    print("\n5. Running Pylint...")
-    success, output = run_command(["pylint", "--score=no", "--reports=no"] + python_files, "Pylint")
     # Pylint is very strict, so we don't fail on it
-    results.append(("Pylint", True, "Informational only"))
+    if with_pylint:
+        results.append(("Pylint", True, "Informational only"))
+    else:
+        results.append(("Pylint", True, "Skipped (use --with-pylint)"))
+    return results
 
-    # Summary
+
+def report_results(results: list) -> bool:
+    """Print the summary and write code_quality_report.txt; True if every check passed"""
     print("\n" + "=" * 80)
     print("SUMMARY")
     print("=" * 80)
@@ -128,8 +318,63 @@ def main():
             f.write("-" * 40 + "\n\n")
 
     print(f"\nDetailed report saved to: {report_path}")
+    return all_passed
+
+
+def main():
+    """Run all code quality checks"""
+    args = parse_args()
+
+    print("OMEGA6 Code Quality Check")
+    print("=" * 80)
+
+    # Change to OMEGA6 directory
+    omega6_dir = Path(__file__).parent
+    os.chdir(omega6_dir)
+
+    # Ensure we're in virtual environment
+    if not os.environ.get("VIRTUAL_ENV"):
+        print("⚠️  Not in virtual environment. Please run: source venv/bin/activate")
+        return 1
+
+    # Define Python files to check
+    python_files = collect_python_files(".")
+
+    print(f"Found {len(python_files)} Python files to check")
+
+    # Tool name, package, command, description, per-file cacheable.
+    # MyPy and Pylint check across modules (imports, duplicate code), so a file's result
+    # depends on the others and they always see every file.
+    tools = [
+        ("Black", "black", ["black", "--check", "--diff"], "Black (checking)", True),
+        ("isort", "isort", ["isort", "--check-only", "--diff"], "isort (checking)", True),
+        ("Flake8", "flake8", ["flake8", "--statistics", "--count"], "Flake8", True),
+        ("MyPy", "mypy", ["mypy", "--no-error-summary"], "MyPy", False),
+    ]
+    if args.with_pylint:
+        # --jobs=0 lets Pylint spread the files over all CPU cores
+        pylint_cmd = ["pylint", "--score=no", "--reports=no", "--jobs=0"]
+        tools.append(("Pylint", "pylint", pylint_cmd, "Pylint", False))
+
+    # Skip files that already passed a tool and haven't changed since
+    cache = None if args.no_cache else LintCache(CACHE_PATH)
+    checks, tool_files, tool_keys = plan_checks(tools, python_files, cache)
+
+    # Run checks - the tools are independent, so they run concurrently
+    jobs = args.jobs if args.jobs is not None else len(checks)
+    print(f"\nRunning {len(checks)} checks with {jobs} parallel jobs...")
+    outcomes = run_checks(checks, jobs)
+    for name in tool_files:
+        outcomes.setdefault(name, (True, ""))
+
+    if cache is not None:
+        for name, key in tool_keys.items():
+            if outcomes[name][0]:
+                cache.mark_passed(key, tool_files[name])
+        cache.save()
 
-    return 0 if all_passed else 1
+    results = collect_results(outcomes, tool_files, python_files, args.with_pylint)
+    return 0 if report_results(results) else 1
 
 
 if __name__ == "__main__":
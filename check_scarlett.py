@@ -9,25 +9,24 @@ def check_with_sounddevice():
     print("=== SOUNDDEVICE CHECK ===")
     devices = sd.query_devices()
     
-    # Check if device index 3 exists (from aplay -l output)
-    for i in range(20):  # Check more devices
-        try:
-            device = sd.query_devices(i)
-            name = device['name'].lower()
-            if 'scarlett' in name or '2i2' in name or 'gen' in name:
-                print(f"✓ Found Scarlett at index {i}: {device['name']}")
-                print(f"  Channels: {device['max_input_channels']} in, {device['max_output_channels']} out")
-        except:
-            pass
+    # Check every enumerated device (Scarlett showed up as index 3 in aplay -l output)
+    for i, device in enumerate(devices):
+        name = device['name'].lower()
+        if 'scarlett' in name or '2i2' in name or 'gen' in name:
+            print(f"✓ Found Scarlett at index {i}: {device['name']}")
+            print(f"  Channels: {device['max_input_channels']} in, {device['max_output_channels']} out")
 
 def check_alsa_devices():
     """Check ALSA devices directly"""
     print("\n=== ALSA DEVICE CHECK ===")
     
     # Get card info
-    result = subprocess.run(['cat', '/proc/asound/cards'], capture_output=True, text=True)
     print("Sound cards:")
-    print(result.stdout)
+    try:
+        with open('/proc/asound/cards') as f:
+            print(f.read())
+    except OSError as e:
+        print(f"Could not read /proc/asound/cards: {e}")
     
     # Check for hw:3,0 device (Scarlett)
     print("\nTrying to access Scarlett directly via ALSA...")
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 """Debug audio capture to check if we're getting data"""
 
+import math
 import sounddevice as sd
-import numpy as np
 import time
 
 def find_pipewire_device():
@@ -36,9 +36,9 @@ def test_audio_capture():
         if status:
             print(f"⚠️  Status: {status}")
         
-        # Calculate level
-        level = np.max(np.abs(indata))
-        level_db = 20 * np.log10(max(level, 1e-10))
+        # Calculate level (scalar reductions, no abs() temporary on the realtime thread)
+        level = float(max(indata.max(), -indata.min()))
+        level_db = 20 * math.log10(max(level, 1e-10))
         
         # Print level meter
         bar_length = int((level_db + 60) / 60 * 40)  # Scale -60 to 0 dB
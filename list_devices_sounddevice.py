@@ -9,6 +9,8 @@ def list_audio_devices():
     
     # Get all devices
     devices = sd.query_devices()
+    apis = sd.query_hostapis()
+    default_input, default_output = sd.default.device
     
     print(f"Total devices found: {len(devices)}\n")
     
@@ -27,21 +29,20 @@ def list_audio_devices():
             print(f"\nDevice {i}: {name}")
             print("-" * 40)
             
-        print(f"  Host API: {device['hostapi']} ({sd.query_hostapis(device['hostapi'])['name']})")
+        print(f"  Host API: {device['hostapi']} ({apis[device['hostapi']]['name']})")
         print(f"  Input channels: {device['max_input_channels']}")
         print(f"  Output channels: {device['max_output_channels']}")
         print(f"  Default sample rate: {device['default_samplerate']} Hz")
         
         # Check if default
-        if i == sd.default.device[0]:
+        if i == default_input:
             print("  🔹 DEFAULT INPUT DEVICE")
-        if i == sd.default.device[1]:
+        if i == default_output:
             print("  🔹 DEFAULT OUTPUT DEVICE")
             
     # Also check host APIs
     print("\n\n=== HOST APIs ===")
     try:
-        apis = sd.query_hostapis()
         for i, api in enumerate(apis):
             print(f"\n{i}: {api['name']}:")
             print(f"  Default input: {api.get('default_input_device', 'N/A')}")
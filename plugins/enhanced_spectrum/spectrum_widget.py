@@ -6,6 +6,8 @@ Real-time spectrum analyzer with multiple display modes
 # Add parent directory to path for imports
 import sys
 from pathlib import Path
+from time import monotonic
+
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 import numpy as np
@@ -14,6 +16,102 @@ from PyQt5 import QtCore, QtWidgets
 
 from src.plugin_base import VisualizationPlugin
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional, fall back to in-place NumPy ufuncs
+    njit = None  # type: ignore[assignment]
+
+
+# _spectrum_step arguments after fft_data, which holds float32 magnitudes or
+# complex64 bins; with explicit signatures Numba compiles (or loads from its
+# cache) when the plugin is loaded rather than on the first FFT frame
+_SPECTRUM_STEP_ARGS = "i4[:], f8, f4[:], f4[:], f4, f4, b1, f4[:], f4[:], f8, f8, f8"
+
+if njit is not None:
+
+    @njit(
+        [f"void(f4[:], {_SPECTRUM_STEP_ARGS})", f"void(c8[:], {_SPECTRUM_STEP_ARGS})"],
+        fastmath=True,
+        cache=True,
+        nogil=True,
+    )
+    def _spectrum_step(
+        fft_data,
+        bar_of_bin,
+        db_floor,
+        power,
+        spectrum,
+        alpha,
+        one_minus_alpha,
+        update_peaks,
+        peaks,
+        timestamps,
+        current_time,
+        hold_time,
+        decay_rate,
+    ):
+        """Whole per-frame spectrum update: one pass over the FFT bins taking each bar's
+        maximum power (re² + im², so magnitudes and complex input alike), then one pass
+        over the bars for dB conversion, averaging and peak hold"""
+        for i in range(power.size):
+            power[i] = -1.0
+        for k in range(min(fft_data.size, bar_of_bin.size)):
+            bar = bar_of_bin[k]
+            if bar >= 0:
+                v = fft_data[k]
+                p = v.real * v.real + v.imag * v.imag
+                if p > power[bar]:
+                    power[bar] = p
+
+        for i in range(spectrum.size):
+            # Bars without FFT bins are still at the -1 marker
+            p = power[i]
+            db = db_floor if p < 0.0 else 10.0 * np.log10(p if p > 1e-20 else 1e-20)
+            spectrum[i] = alpha * spectrum[i] + one_minus_alpha * db
+            # Compare peaks against the stored (float32-rounded) level
+            level = spectrum[i]
+
+            if update_peaks:
+                peak = peaks[i]
+                # New peaks restart their hold time, so they never decay here and are
+                # raised to their level by the floor below
+                timestamp = current_time if level > peak else timestamps[i]
+                timestamps[i] = timestamp
+                peak = peak * decay_rate if current_time - timestamp > hold_time else peak
+                peaks[i] = peak if peak > level else level
+
+else:
+    # NumPy path is inlined in process_fft
+    _spectrum_step = None
+
+    def _level_to_db(level, scale, floor, out):
+        """Convert magnitudes (scale 20) or powers (scale 10) to dB reusing the output buffer"""
+        np.abs(level, out=out)
+        np.maximum(out, floor, out=out)
+        np.log10(out, out=out)
+        out *= scale
+        return out
+
+
+# Frequency axis ticks: (frequency, (log10 position, label))
+_FREQ_TICK_POINTS = tuple(
+    (freq, (float(np.log10(freq)), str(freq)))
+    for freq in (20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000)
+)
+
+
+def _aligned_full(n: int, value, dtype=np.float32, align: int = 64) -> np.ndarray:
+    """Create a filled 1-D array whose data starts on an align-byte boundary,
+    so the per-frame ufunc loops on it run at full SIMD width"""
+    dtype = np.dtype(dtype)
+    nbytes = n * dtype.itemsize
+    raw = np.empty(nbytes + align, dtype=np.uint8)
+    offset = -raw.ctypes.data % align
+    out: np.ndarray = raw[offset : offset + nbytes].view(dtype)
+    out.fill(value)
+    return out
+
 
 class EnhancedSpectrumWidget(VisualizationPlugin):
     """Enhanced spectrum analyzer plugin"""
@@ -22,6 +120,12 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
     PLUGIN_VERSION = "1.0.0"
     PLUGIN_DESCRIPTION = "Multi-resolution spectrum analyzer with peak hold"
 
+    # Smallest bar height change (dB) worth a repaint
+    REPAINT_THRESHOLD_DB = 0.25
+
+    # process_fft only updates the arrays below; the paint timer draws them
+    THREADED_FFT = True
+
     def __init__(self, parent=None):
         # Initialize settings before parent init
         self.num_bars = 256
@@ -36,9 +140,22 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
         self.averaging_factor = 0.8
 
         # Data arrays - initialize with db_floor
-        self.spectrum_data = np.full(self.num_bars, self.db_floor)
-        self.peak_data = np.full(self.num_bars, self.db_floor)
-        self.peak_timestamps = np.zeros(self.num_bars)
+        self.spectrum_data = _aligned_full(self.num_bars, self.db_floor)
+        self.peak_data = _aligned_full(self.num_bars, self.db_floor)
+        self.peak_timestamps = _aligned_full(self.num_bars, 0.0)
+
+        # Peak timestamps are relative to this so they stay small in float32
+        self._start_time = monotonic()
+
+        # Power buffers for complex FFT input, resized to match incoming data
+        self._power_buf = np.empty(0, dtype=np.float32)
+        self._power_tmp = np.empty(0, dtype=np.float32)
+
+        # FFT bin -> bar index maps, keyed by FFT size and frequency range
+        self._bin_idx_cache = {}
+
+        # Set when new data is waiting to be painted
+        self._dirty = False
 
         # Colors
         self.spectrum_color = (100, 200, 255)  # Light blue
@@ -46,6 +163,18 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
 
         super().__init__(parent)
 
+    @property
+    def averaging_factor(self) -> float:
+        """Weight of the previous spectrum in the moving average (0 = no averaging)"""
+        return self._averaging_factor
+
+    @averaging_factor.setter
+    def averaging_factor(self, value: float):
+        # Keep float32 weights ready so the per-frame update stays in float32
+        self._averaging_factor = value
+        self._alpha = np.float32(value)
+        self._one_minus_alpha = np.float32(1.0) - self._alpha
+
     def _init_visualization(self):
         """Initialize spectrum visualization"""
         # Create plot widget
@@ -59,20 +188,17 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
         # Y-axis from 0 to db_range for positive bar heights
         self.plot_widget.setYRange(0, self.db_range)
         self.plot_widget.setXRange(np.log10(self.min_freq), np.log10(self.max_freq))
-        
+
         # Set custom tick labels for frequency axis
-        x_ticks = []
-        for freq in [20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000]:
-            if self.min_freq <= freq <= self.max_freq:
-                x_ticks.append((np.log10(freq), str(freq)))
-        self.plot_widget.getAxis('bottom').setTicks([x_ticks])
+        x_ticks = [
+            tick for freq, tick in _FREQ_TICK_POINTS if self.min_freq <= freq <= self.max_freq
+        ]
+        self.plot_widget.getAxis("bottom").setTicks([x_ticks])
 
         # Create bar items
         self.create_frequency_bins()
 
-        # Initialize bar graphs (will be updated with data)
-        self.spectrum_bars = None
-        self.peak_bars = None
+        # Initialize bar graphs once, later frames update them in place
         self._create_bars()
 
         # Add to layout
@@ -81,39 +207,46 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
         # Add controls
         self._create_controls()
 
+        # Repaint at display rate, independent of how often FFT data arrives
+        self._paint_timer = QtCore.QTimer(self)
+        self._paint_timer.setInterval(16)  # ~60 Hz
+        self._paint_timer.timeout.connect(self._update_display)
+        self._paint_timer.start()
+
     def _create_bars(self):
-        """Create or recreate bar graph items"""
-        # Remove old bars if they exist
-        if self.spectrum_bars is not None:
-            self.plot_widget.removeItem(self.spectrum_bars)
-        if self.peak_bars is not None:
-            self.plot_widget.removeItem(self.peak_bars)
-            
-        # Convert spectrum data to display heights
-        display_spectrum = np.maximum(self.spectrum_data, self.db_floor)
-        display_peaks = np.maximum(self.peak_data, self.db_floor)
-        spectrum_heights = display_spectrum - self.db_floor
-        peak_heights = display_peaks - self.db_floor
-        
-        # Create new bar items with current data
+        """Create bar graph items"""
+        spectrum_heights, peak_heights = self._compute_heights()
+
+        # Create bar items with current data
         self.spectrum_bars = pg.BarGraphItem(
             x=self.bar_positions,
             height=spectrum_heights,
             width=self.bar_widths,
             brush=self.spectrum_color,
-            pen=None
+            pen=None,
         )
         self.plot_widget.addItem(self.spectrum_bars)
-        
-        if self.show_peak_hold:
-            self.peak_bars = pg.BarGraphItem(
-                x=self.bar_positions,
-                height=peak_heights,
-                width=self.bar_widths,
-                brush=self.peak_color,
-                pen=None
-            )
-            self.plot_widget.addItem(self.peak_bars)
+
+        # Peak bars always exist and are hidden while peak hold is off
+        self.peak_bars = pg.BarGraphItem(
+            x=self.bar_positions,
+            height=peak_heights,
+            width=self.bar_widths,
+            brush=self.peak_color,
+            pen=None,
+        )
+        self.peak_bars.setVisible(self.show_peak_hold)
+        self.plot_widget.addItem(self.peak_bars)
+
+    def _compute_heights(self):
+        """Convert spectrum data to display heights"""
+        spectrum_heights = np.subtract(
+            self.spectrum_data, self.db_floor, out=self._spectrum_heights
+        )
+        np.maximum(spectrum_heights, 0, out=spectrum_heights)
+        peak_heights = np.subtract(self.peak_data, self.db_floor, out=self._peak_heights)
+        np.maximum(peak_heights, 0, out=peak_heights)
+        return spectrum_heights, peak_heights
 
     def create_frequency_bins(self):
         """Create logarithmically spaced frequency bins"""
@@ -131,6 +264,20 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
 
         # Store bin edges for FFT mapping
         self.bin_edges = bin_edges
+        self._bin_idx_cache.clear()
+
+        # Per-frame work buffers, reused to avoid allocations in the hot path
+        num_bars = self.num_bars
+        self._new_spectrum = _aligned_full(num_bars, self.db_floor)
+        self._spectrum_heights = np.empty(num_bars, dtype=np.float32)
+        self._peak_heights = np.empty(num_bars, dtype=np.float32)
+        self._peak_age = np.empty(num_bars, dtype=np.float32)
+        self._peak_mask = np.empty(num_bars, dtype=bool)
+        self._height_delta = np.empty(num_bars, dtype=np.float32)
+
+        # Heights last sent to the bar items (NaN forces the first update)
+        self._last_spectrum_heights = np.full(num_bars, np.nan, dtype=np.float32)
+        self._last_peak_heights = np.full(num_bars, np.nan, dtype=np.float32)
 
     def _create_controls(self):
         """Create control panel"""
@@ -173,34 +320,44 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
         """Toggle peak hold display"""
         self.show_peak_hold = self.peak_toggle.isChecked()
         self.peak_toggle.setText(f"Peak Hold: {'ON' if self.show_peak_hold else 'OFF'}")
-        
+
         if not self.show_peak_hold:
             self._reset_peaks()
-        
-        # Recreate bars to show/hide peaks
-        self._create_bars()
+
+        # Show/hide peaks
+        self.peak_bars.setVisible(self.show_peak_hold)
+        self._dirty = True
 
     def _reset_peaks(self):
         """Reset peak hold values"""
-        self.peak_data.fill(self.db_floor)
-        self.peak_timestamps.fill(0)
-        self._update_display()
+        with self.fft_lock:
+            self.peak_data.fill(self.db_floor)
+            self.peak_timestamps.fill(0)
+        self._dirty = True
 
     def _change_bar_count(self, text: str):
         """Change number of spectrum bars"""
         try:
             new_count = int(text)
             if new_count != self.num_bars:
-                self.num_bars = new_count
-                self.spectrum_data = np.full(self.num_bars, self.db_floor)
-                self.peak_data = np.full(self.num_bars, self.db_floor)
-                self.peak_timestamps = np.zeros(self.num_bars)
+                with self.fft_lock:
+                    self.num_bars = new_count
+                    self.spectrum_data = _aligned_full(self.num_bars, self.db_floor)
+                    self.peak_data = _aligned_full(self.num_bars, self.db_floor)
+                    self.peak_timestamps = _aligned_full(self.num_bars, 0.0)
+
+                    # Recreate frequency bins
+                    self.create_frequency_bins()
+
+                    spectrum_heights, peak_heights = self._compute_heights()
 
-                # Recreate frequency bins
-                self.create_frequency_bins()
-                
-                # Recreate bars
-                self._create_bars()
+                # Resize existing bars in place
+                self.spectrum_bars.setOpts(
+                    x=self.bar_positions, width=self.bar_widths, height=spectrum_heights
+                )
+                self.peak_bars.setOpts(
+                    x=self.bar_positions, width=self.bar_widths, height=peak_heights
+                )
 
         except ValueError:
             pass
@@ -208,8 +365,10 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
     def _change_range(self, text: str):
         """Change dB range"""
         try:
-            self.db_range = int(text.split()[0])
-            self.db_floor = -self.db_range
+            db_range = int(text.split()[0])
+            with self.fft_lock:
+                self.db_range = db_range
+                self.db_floor = -db_range
             self.plot_widget.setYRange(0, self.db_range)
         except ValueError:
             pass
@@ -224,52 +383,133 @@ class EnhancedSpectrumWidget(VisualizationPlugin):
         if fft_data.size == 0:
             return
 
-        # Convert to dB
-        magnitude = np.abs(fft_data)
-        db_data = 20 * np.log10(np.maximum(magnitude, 1e-10))
+        valid, valid_starts, stop, binned, bar_of_bin = self._get_bin_indices(frequencies)
+        current_time = monotonic() - self._start_time
+        decay_rate = 0.95  # Decay factor per update
 
-        # Map FFT bins to display bars
-        new_spectrum = np.full(self.num_bars, self.db_floor)
+        if _spectrum_step is not None:
+            # Fused kernel: single sweep over the FFT bins and one over the bars,
+            # compiled for the float32 pipeline types only
+            fft_data = np.asarray(
+                fft_data, dtype=np.complex64 if np.iscomplexobj(fft_data) else np.float32
+            )
+            _spectrum_step(
+                fft_data,
+                bar_of_bin,
+                self.db_floor,
+                self._new_spectrum,
+                self.spectrum_data,
+                self._alpha,
+                self._one_minus_alpha,
+                self.show_peak_hold,
+                self.peak_data,
+                self.peak_timestamps,
+                current_time,
+                self.peak_hold_time,
+                decay_rate,
+            )
+            self._dirty = True
+            return
+
+        # Magnitudes are converted with 20*log10; complex input is reduced to power
+        # (re² + im², no sqrt) and converted with 10*log10 instead
+        level = fft_data
+        db_scale, db_min = 20.0, 1e-10
+        if np.iscomplexobj(fft_data):
+            if self._power_buf.size != fft_data.size:
+                self._power_buf = np.empty(fft_data.size, dtype=np.float32)
+                self._power_tmp = np.empty(fft_data.size, dtype=np.float32)
+            level = np.square(fft_data.real, out=self._power_buf)
+            level += np.square(fft_data.imag, out=self._power_tmp)
+            db_scale, db_min = 10.0, 1e-20
 
-        for i in range(self.num_bars):
-            # Find FFT bins in this frequency range
-            freq_mask = (frequencies >= self.bin_edges[i]) & (frequencies < self.bin_edges[i + 1])
+        # Map FFT bins to display bars
+        new_spectrum = self._new_spectrum
+        new_spectrum.fill(self.db_floor)
 
-            if np.any(freq_mask):
-                # Use maximum value in bin
-                new_spectrum[i] = np.max(db_data[freq_mask])
+        if valid_starts.size:
+            # Use maximum value in bin, converted to dB only at display resolution
+            # (log10 is monotonic, so max-then-dB equals dB-then-max)
+            np.maximum.reduceat(level[:stop], valid_starts, out=binned)
+            new_spectrum[valid] = _level_to_db(binned, db_scale, db_min, binned)
 
         # Apply averaging
-        self.spectrum_data = (
-            self.averaging_factor * self.spectrum_data + (1 - self.averaging_factor) * new_spectrum
-        )
+        np.multiply(self.spectrum_data, self._alpha, out=self.spectrum_data)
+        new_spectrum *= self._one_minus_alpha
+        self.spectrum_data += new_spectrum
 
         # Update peak hold
         if self.show_peak_hold:
-            current_time = QtCore.QTime.currentTime().msecsSinceStartOfDay() / 1000.0
-
-            # Update peaks where current value exceeds
-            peak_mask = self.spectrum_data > self.peak_data
-            self.peak_data[peak_mask] = self.spectrum_data[peak_mask]
-            self.peak_timestamps[peak_mask] = current_time
+            # Restart the hold time where the current value exceeds the peak.
+            # Those peaks are not raised here: they can't have expired, so the
+            # final floor below lifts them to the spectrum in the same pass
+            new_peaks = np.greater(self.spectrum_data, self.peak_data, out=self._peak_mask)
+            np.copyto(self.peak_timestamps, current_time, where=new_peaks)
 
             # Decay old peaks
-            old_peaks = (current_time - self.peak_timestamps) > self.peak_hold_time
-            decay_rate = 0.95  # Decay factor per update
-            self.peak_data[old_peaks] *= decay_rate
+            peak_age = np.subtract(current_time, self.peak_timestamps, out=self._peak_age)
+            old_peaks = np.greater(peak_age, self.peak_hold_time, out=self._peak_mask)
+            np.multiply(self.peak_data, decay_rate, out=self.peak_data, where=old_peaks)
 
             # Ensure peaks don't go below current spectrum
-            self.peak_data = np.maximum(self.peak_data, self.spectrum_data)
-
-        # Update display
-        self._update_display()
+            np.maximum(self.peak_data, self.spectrum_data, out=self.peak_data)
+
+        # Display is refreshed by the paint timer
+        self._dirty = True
+
+    def _get_bin_indices(self, frequencies: np.ndarray):
+        """Get cached FFT bin -> display bar mappings, with a buffer for the bar maxima"""
+        key = (frequencies.size, float(frequencies[0]), float(frequencies[-1]))
+        indices = self._bin_idx_cache.get(key)
+        if indices is None:
+            # Slice boundaries of each bar within the (sorted) FFT frequencies
+            starts = np.searchsorted(frequencies, self.bin_edges[:-1], side="left")
+            ends = np.searchsorted(frequencies, self.bin_edges[1:], side="left")
+            valid = ends > starts
+
+            # Empty bars are skipped so each reduction runs up to the next
+            # non-empty bar, and the last one stops at its own end
+            valid_starts = starts[valid].astype(np.int32)
+            stop = int(ends[valid][-1]) if valid_starts.size else 0
+
+            # Bar of each FFT bin (-1 outside the display range), for the Numba kernel
+            bar_of_bin = np.searchsorted(self.bin_edges, frequencies, side="right") - 1
+            bar_of_bin[bar_of_bin >= self.num_bars] = -1
+            bar_of_bin = bar_of_bin.astype(np.int32)
+
+            binned = np.empty(valid_starts.size, dtype=np.float32)
+            indices = (valid, valid_starts, stop, binned, bar_of_bin)
+            self._bin_idx_cache[key] = indices
+        return indices
 
     def _update_display(self):
-        """Update the spectrum display by recreating bars"""
-        # Recreate bars with new data
-        self._create_bars()
+        """Update the spectrum display in place"""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        # Heights are copied out of the spectrum arrays, so only this needs the lock
+        with self.fft_lock:
+            spectrum_heights, peak_heights = self._compute_heights()
+
+        # Each setOpts triggers a full repaint, so skip frames that look the same
+        if self._needs_repaint(spectrum_heights, self._last_spectrum_heights):
+            self.spectrum_bars.setOpts(height=spectrum_heights)
+            np.copyto(self._last_spectrum_heights, spectrum_heights)
+
+        if self.show_peak_hold:
+            if self._needs_repaint(peak_heights, self._last_peak_heights):
+                self.peak_bars.setOpts(height=peak_heights)
+                np.copyto(self._last_peak_heights, peak_heights)
+
+    def _needs_repaint(self, heights: np.ndarray, last_heights: np.ndarray) -> bool:
+        """Check if any bar moved by more than the repaint threshold since it was drawn"""
+        delta = np.subtract(heights, last_heights, out=self._height_delta)
+        np.abs(delta, out=delta)
+        # NaN (never drawn) fails the comparison, so it always repaints
+        return not delta.max() <= self.REPAINT_THRESHOLD_DB
 
     def _update_visualization_size(self):
         """Handle resize events"""
         # PyQtGraph handles this automatically
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,304 @@
+"""
+Studio Meters Worker
+Computes RMS, True Peak and LUFS readings on a background thread
+"""
+
+import logging
+from collections import deque
+from time import monotonic_ns
+from typing import Dict
+
+import numpy as np
+from PyQt5 import QtCore
+from scipy import signal
+
+
+class MeterWorker(QtCore.QObject):
+    """Meter calculations, run on a QThread so they never block repaints"""
+
+    # Reduced display values for the blocks metered since the last readings
+    results_ready = QtCore.pyqtSignal(dict)
+    # Wakes _drain on the worker thread when enqueue adds to an idle queue
+    _blocks_queued = QtCore.pyqtSignal()
+
+    # Capture blocks waiting to be metered; beyond this the oldest are dropped
+    QUEUE_SIZE = 256
+    # Readings go to the widget at most this often
+    RESULTS_INTERVAL_NS = 50_000_000
+
+    # 4x oversampling interpolation filter for true peak (ITU-R BS.1770 Annex 2),
+    # low-pass at the original Nyquist, gain compensates for zero-stuffing
+    TRUE_PEAK_OVERSAMPLING = 4
+    TRUE_PEAK_FILTER = (
+        signal.firwin(48, 1 / TRUE_PEAK_OVERSAMPLING) * TRUE_PEAK_OVERSAMPLING
+    ).astype(np.float32)
+    # Input samples the filter reaches back, carried over from the previous block
+    TRUE_PEAK_HISTORY = len(TRUE_PEAK_FILTER) // TRUE_PEAK_OVERSAMPLING
+
+    # Number of per-block loudness values kept for short-term/integrated LUFS
+    LUFS_HISTORY_SIZE = 300
+    # Simple absolute gate for the integrated measurement
+    LUFS_GATE = -70.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+
+        # (sequence number, block copy, sample rate) from enqueue, drained in order
+        self._queue: deque = deque(maxlen=self.QUEUE_SIZE)
+        self._next_seq = 0
+        self._expected_seq = 0
+        self._drain_scheduled = False
+        self._blocks_queued.connect(self._drain, QtCore.Qt.QueuedConnection)
+
+        # Readings accumulated since the last results_ready: per-channel sum of
+        # squares and frame count for RMS, highest true peak, latest loudness
+        self._sum_squares = np.zeros(2)
+        self._frames = 0
+        self._true_peak = np.full(2, -100.0)
+        self._lufs_momentary = -100.0
+        self._lufs_short = -100.0
+        self._last_results_ns = 0
+
+        # Settings, changed through configure()
+        self.weighting = "K"
+        self.gated = True
+
+        # History for integrated measurements (ring buffer)
+        self.lufs_history = np.full(self.LUFS_HISTORY_SIZE, -np.inf, dtype=np.float32)
+        self._hist_idx = 0
+        self._hist_count = 0
+        # Running sums of the history (all values, and those above the gate)
+        self._hist_sum = 0.0
+        self._gated_sum = 0.0
+        self._gated_count = 0
+        self.lufs_integrated = -100.0
+
+        # K-weighting filter: second-order sections cached per sample rate,
+        # plus the filter state carried across blocks
+        self._k_sos_cache: Dict[int, np.ndarray] = {}
+        self._k_zi = None
+        self._k_zi_key = None
+
+        # Tail of the previous block, so the oversampling filter sees a continuous signal
+        self._tp_history = None
+        self._tp_history_key = None
+
+    @QtCore.pyqtSlot(str, bool)
+    def configure(self, weighting: str, gated: bool):
+        """Change weighting mode and gating"""
+        self.weighting = weighting
+        self.gated = gated
+
+    @QtCore.pyqtSlot()
+    def reset(self):
+        """Reset integrated measurements"""
+        self.lufs_history.fill(-np.inf)
+        self._hist_idx = 0
+        self._hist_count = 0
+        self._hist_sum = 0.0
+        self._gated_sum = 0.0
+        self._gated_count = 0
+        self.lufs_integrated = -100.0
+
+    def enqueue(self, audio_data: np.ndarray, sample_rate: int):
+        """Queue a copy of one capture block for metering; called on the audio thread"""
+        if audio_data.size == 0:
+            return
+        self._queue.append((self._next_seq, np.array(audio_data, dtype=np.float32), sample_rate))
+        self._next_seq += 1
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            self._blocks_queued.emit()
+
+    @QtCore.pyqtSlot()
+    def _drain(self):
+        """Meter every queued block in order, then send the readings if they are due"""
+        # Cleared first, so a block queued while draining schedules another drain
+        self._drain_scheduled = False
+        queue = self._queue
+        while queue:
+            seq, audio_data, sample_rate = queue.popleft()
+            if seq != self._expected_seq:
+                # Blocks were dropped (or failed); the filters must not run on across the gap
+                self._reset_filters()
+            # An exception escaping a slot would abort the application under PyQt5
+            try:
+                self._measure(audio_data, sample_rate)
+                self._expected_seq = seq + 1
+            except Exception as e:
+                self.logger.error(f"Error metering audio: {e}")
+
+        now = monotonic_ns()
+        if self._frames and now - self._last_results_ns >= self.RESULTS_INTERVAL_NS:
+            self._last_results_ns = now
+            self.results_ready.emit(self._take_results())
+
+    def _reset_filters(self):
+        """Restart the K-weighting and true-peak filters from silence"""
+        self._k_zi = None
+        self._tp_history = None
+
+    def _measure(self, audio_data: np.ndarray, sample_rate: int):
+        """Meter one block, adding it to the pending readings"""
+        # Ensure stereo
+        if audio_data.ndim == 1:
+            audio_data = np.column_stack((audio_data, audio_data))
+
+        # Left/right channels as one (frames, 2) array, so both are metered in one pass
+        if audio_data.shape[1] > 1:
+            stereo = audio_data[:, :2]
+        else:
+            stereo = np.column_stack((audio_data[:, 0], audio_data[:, 0]))
+
+        # RMS
+        self._sum_squares += np.einsum("ij,ij->j", stereo, stereo, dtype=np.float64)
+        self._frames += len(stereo)
+
+        # True Peak
+        np.maximum(
+            self._true_peak, self._calculate_true_peak(stereo, sample_rate), out=self._true_peak
+        )
+
+        # LUFS
+        self._lufs_momentary, self._lufs_short = self._calculate_lufs(audio_data, sample_rate)
+
+    def _take_results(self) -> dict:
+        """Display values of the pending readings, starting a new set"""
+        rms = 10 * np.log10(np.maximum(self._sum_squares / self._frames, 1e-20))
+        results = {
+            "rms_l": float(rms[0]),
+            "rms_r": float(rms[1]),
+            "true_peak_l": float(self._true_peak[0]),
+            "true_peak_r": float(self._true_peak[1]),
+            "lufs_momentary": self._lufs_momentary,
+            "lufs_short": self._lufs_short,
+            "lufs_integrated": self.lufs_integrated,
+        }
+        self._sum_squares[:] = 0.0
+        self._frames = 0
+        self._true_peak[:] = -100.0
+        return results
+
+    def _calculate_true_peak(self, data: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Calculate per-channel true peak with oversampling for (frames, channels) data"""
+        if data.size == 0:
+            return np.full(data.shape[1], -100.0)
+
+        # Continue from the tail of the previous block; start from silence when the
+        # stream format changes
+        history = self.TRUE_PEAK_HISTORY
+        key = (sample_rate, data.shape[1])
+        if self._tp_history is None or self._tp_history_key != key:
+            self._tp_history = np.zeros((history, data.shape[1]), dtype=np.float32)
+            self._tp_history_key = key
+        extended = np.concatenate((self._tp_history, data))
+        self._tp_history = extended[-history:]
+
+        # Band-limited 4x oversampling with a polyphase FIR, all channels at once.
+        # Only the outputs timed within this block count: the leading ones belong to
+        # the previous block and the trailing ones lack the next block's samples.
+        up = self.TRUE_PEAK_OVERSAMPLING
+        oversampled = signal.upfirdn(self.TRUE_PEAK_FILTER, extended, up=up, axis=0)
+        oversampled = oversampled[history * up : len(extended) * up]
+
+        peak = np.max(np.abs(oversampled), axis=0)
+        return np.asarray(20 * np.log10(np.maximum(peak, 1e-10)))
+
+    def _calculate_lufs(self, audio_data: np.ndarray, sample_rate: int) -> tuple:
+        """Calculate LUFS values, returning momentary and short-term loudness"""
+        # Simplified LUFS calculation
+        # In production, use pyloudnorm or implement full ITU-R BS.1770-4
+
+        # Apply K-weighting (pre-filter + RLB high-pass)
+        if self.weighting == "K":
+            weighted = self._apply_k_weighting(audio_data, sample_rate)
+        else:
+            weighted = audio_data
+
+        # Calculate power
+        power = np.mean(weighted**2, axis=0)
+        lufs = -0.691 + 10 * np.log10(np.mean(power) + 1e-10)
+
+        # Add to history for integrated measurement, overwriting the oldest value
+        self._add_to_history(lufs)
+        lufs_short = self._hist_sum / self._hist_count
+
+        # Integrated (gated if enabled)
+        if self.gated and self._hist_count > 10:
+            if self._gated_count:
+                self.lufs_integrated = self._gated_sum / self._gated_count
+        else:
+            self.lufs_integrated = lufs_short
+
+        return float(lufs), lufs_short
+
+    def _add_to_history(self, lufs: float):
+        """Store a value in the ring buffer, keeping the running sums in step"""
+        idx = self._hist_idx
+        if self._hist_count == self.LUFS_HISTORY_SIZE:
+            old = float(self.lufs_history[idx])
+            self._hist_sum -= old
+            if old > self.LUFS_GATE:
+                self._gated_sum -= old
+                self._gated_count -= 1
+
+        self.lufs_history[idx] = lufs
+        # Sum the stored float32 value, so evicting it later cancels exactly
+        new = float(self.lufs_history[idx])
+        self._hist_sum += new
+        if new > self.LUFS_GATE:
+            self._gated_sum += new
+            self._gated_count += 1
+
+        self._hist_idx = (idx + 1) % self.LUFS_HISTORY_SIZE
+        self._hist_count = min(self._hist_count + 1, self.LUFS_HISTORY_SIZE)
+
+    def _k_weighting_sos(self, sample_rate: int) -> np.ndarray:
+        """Get the BS.1770 K-weighting filter for a sample rate as second-order sections"""
+        sos = self._k_sos_cache.get(sample_rate)
+        if sos is not None:
+            return sos
+
+        # Stage 1: high-shelf pre-filter (models the acoustic effect of the head)
+        f0 = 1681.974450955533
+        gain_db = 3.999843853973347
+        q = 0.7071752369554196
+        k = np.tan(np.pi * f0 / sample_rate)
+        vh = 10 ** (gain_db / 20)
+        vb = vh**0.4996667741545416
+        a0 = 1 + k / q + k * k
+        shelf = [
+            (vh + vb * k / q + k * k) / a0,
+            2 * (k * k - vh) / a0,
+            (vh - vb * k / q + k * k) / a0,
+            1.0,
+            2 * (k * k - 1) / a0,
+            (1 - k / q + k * k) / a0,
+        ]
+
+        # Stage 2: RLB high-pass
+        f0 = 38.13547087602444
+        q = 0.5003270373238773
+        k = np.tan(np.pi * f0 / sample_rate)
+        a0 = 1 + k / q + k * k
+        highpass = [1.0, -2.0, 1.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+        sos = np.array([shelf, highpass])
+        self._k_sos_cache[sample_rate] = sos
+        return sos
+
+    def _apply_k_weighting(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
+        """K-weight (frames, channels) audio, continuing the filter state of the previous block"""
+        # The filter runs in float64: the RLB high-pass poles sit very close to the
+        # unit circle and are not accurate enough in single precision
+        sos = self._k_weighting_sos(sample_rate)
+
+        # Start from silence when the stream format changes
+        key = (sample_rate, audio_data.shape[1])
+        if self._k_zi is None or self._k_zi_key != key:
+            self._k_zi = np.zeros((sos.shape[0], 2, audio_data.shape[1]))
+            self._k_zi_key = key
+
+        weighted, self._k_zi = signal.sosfilt(sos, audio_data, axis=0, zi=self._k_zi)
+        return np.asarray(weighted)
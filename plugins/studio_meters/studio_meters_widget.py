@@ -14,6 +14,15 @@ from PyQt5 import QtCore, QtWidgets
 
 from src.plugin_base import PluginWidget
 
+from .meter_worker import MeterWorker
+
+
+def _stop_thread(thread: QtCore.QThread):
+    """Quit a worker thread's event loop and wait for it to finish"""
+    if thread.isRunning():
+        thread.quit()
+        thread.wait()
+
 
 class StudioMetersWidget(PluginWidget):
     """Professional studio meters plugin"""
@@ -22,6 +31,14 @@ class StudioMetersWidget(PluginWidget):
     PLUGIN_VERSION = "1.0.0"
     PLUGIN_DESCRIPTION = "Professional audio meters with LUFS, True Peak, and K-weighting"
 
+    # The K-weighting and true-peak filters and the loudness history need every
+    # block in order, which process_block hands to the meter worker's queue
+    AUDIO_BLOCKS = True
+
+    # Hand-off to the meter worker thread
+    _settings_changed = QtCore.pyqtSignal(str, bool)
+    _reset_requested = QtCore.pyqtSignal()
+
     def __init__(self, parent=None):
         # Initialize member variables BEFORE calling super().__init__
         # This ensures they exist when _init_plugin is called
@@ -39,8 +56,7 @@ class StudioMetersWidget(PluginWidget):
         self.weighting_modes = ["K", "A", "C", "Z"]
         self.current_weighting = 0
 
-        # History for integrated measurements
-        self.lufs_history = []
+        # Gating for integrated measurements
         self.gated = True
 
         # Now call parent init which will call _init_plugin
@@ -56,6 +72,22 @@ class StudioMetersWidget(PluginWidget):
         # Add stretch to push everything up
         self.content_layout.addStretch()
 
+        # Meter calculations run on a worker thread; results come back queued
+        # to the GUI thread
+        self._meter_thread = QtCore.QThread(self)
+        self._meter_worker = MeterWorker()
+        self._meter_worker.moveToThread(self._meter_thread)
+        self._settings_changed.connect(self._meter_worker.configure, QtCore.Qt.QueuedConnection)
+        self._reset_requested.connect(self._meter_worker.reset, QtCore.Qt.QueuedConnection)
+        self._meter_worker.results_ready.connect(self._apply_results, QtCore.Qt.QueuedConnection)
+        self._meter_thread.start()
+
+        # The thread must be stopped before it is deleted along with this widget
+        self.destroyed.connect(lambda _=None, thread=self._meter_thread: _stop_thread(thread))
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._stop_meter_thread)
+
     def _create_lufs_section(self):
         """Create LUFS meters section"""
         group = QtWidgets.QGroupBox("LUFS Meters")
@@ -141,8 +173,7 @@ class StudioMetersWidget(PluginWidget):
     def _create_meter_display(self) -> QtWidgets.QLabel:
         """Create a meter value display"""
         display = QtWidgets.QLabel("-∞ LUFS")
-        display.setStyleSheet(
-            """
+        display.setStyleSheet("""
             QLabel {
                 background-color: #1a1a1a;
                 color: #00ff00;
@@ -152,8 +183,7 @@ class StudioMetersWidget(PluginWidget):
                 border: 1px solid #333;
                 border-radius: 3px;
             }
-        """
-        )
+        """)
         display.setAlignment(QtCore.Qt.AlignRight)
         display.setMinimumWidth(120)
         return display
@@ -165,8 +195,7 @@ class StudioMetersWidget(PluginWidget):
         bar.setMaximum(0)
         bar.setValue(-60)
         bar.setTextVisible(False)
-        bar.setStyleSheet(
-            """
+        bar.setStyleSheet("""
             QProgressBar {
                 border: 1px solid #333;
                 border-radius: 3px;
@@ -176,8 +205,7 @@ class StudioMetersWidget(PluginWidget):
                 background-color: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 0,
                     stop: 0 #00ff00, stop: 0.7 #ffff00, stop: 0.9 #ff6600, stop: 1 #ff0000);
             }
-        """
-        )
+        """)
         return bar
 
     def _cycle_weighting(self):
@@ -185,106 +213,52 @@ class StudioMetersWidget(PluginWidget):
         self.current_weighting = (self.current_weighting + 1) % len(self.weighting_modes)
         self.weighting_btn.setText(f"Weighting: {self.weighting_modes[self.current_weighting]}")
         self.set_status(f"Weighting: {self.weighting_modes[self.current_weighting]}")
+        self._settings_changed.emit(self.weighting_modes[self.current_weighting], self.gated)
 
     def _toggle_gating(self):
         """Toggle gating on/off"""
         self.gated = self.gate_btn.isChecked()
         self.gate_btn.setText(f"Gated: {'ON' if self.gated else 'OFF'}")
+        self._settings_changed.emit(self.weighting_modes[self.current_weighting], self.gated)
         self._reset_meters()
 
     def _reset_meters(self):
         """Reset integrated measurements"""
-        self.lufs_history.clear()
+        self._reset_requested.emit()
         self.lufs_integrated = -100.0
         self.set_status("Meters reset")
 
-    def process_audio(self, audio_data: np.ndarray, sample_rate: int):
-        """Process audio data for metering"""
-        if audio_data.size == 0:
-            return
-
-        # Ensure stereo
-        if audio_data.ndim == 1:
-            audio_data = np.column_stack((audio_data, audio_data))
-
-        # Calculate RMS
-        self.rms_l = self._calculate_rms(audio_data[:, 0])
-        self.rms_r = self._calculate_rms(
-            audio_data[:, 1] if audio_data.shape[1] > 1 else audio_data[:, 0]
-        )
-
-        # Calculate True Peak
-        self.true_peak_l = self._calculate_true_peak(audio_data[:, 0], sample_rate)
-        self.true_peak_r = self._calculate_true_peak(
-            audio_data[:, 1] if audio_data.shape[1] > 1 else audio_data[:, 0], sample_rate
-        )
-
-        # Calculate LUFS
-        self._calculate_lufs(audio_data, sample_rate)
+    def process_block(self, audio_data: np.ndarray, sample_rate: int):
+        """Queue every capture block for metering on the worker thread"""
+        self._meter_worker.enqueue(audio_data, sample_rate)
 
-        # Update displays
-        self._update_displays()
+    def process_audio(self, audio_data: np.ndarray, sample_rate: int):
+        """Not used for metering, which takes every block through process_block"""
+        # Unused parameters for this plugin
+        _ = (audio_data, sample_rate)
 
     def process_fft(self, fft_data: np.ndarray, frequencies: np.ndarray):
         """Not used for metering"""
         # Unused parameters for this plugin
         _ = (fft_data, frequencies)
 
-    def _calculate_rms(self, data: np.ndarray) -> float:
-        """Calculate RMS in dB"""
-        if data.size == 0:
-            return -100.0
-
-        rms = np.sqrt(np.mean(data**2))
-        return 20 * np.log10(max(rms, 1e-10))
-
-    def _calculate_true_peak(self, data: np.ndarray, sample_rate: int) -> float:
-        """Calculate true peak with oversampling"""
-        if data.size == 0:
-            return -100.0
+    @QtCore.pyqtSlot(dict)
+    def _apply_results(self, results: dict):
+        """Take over readings computed by the worker thread"""
+        self.rms_l = results["rms_l"]
+        self.rms_r = results["rms_r"]
+        self.true_peak_l = results["true_peak_l"]
+        self.true_peak_r = results["true_peak_r"]
+        self.lufs_momentary = results["lufs_momentary"]
+        self.lufs_short = results["lufs_short"]
+        self.lufs_integrated = results["lufs_integrated"]
 
-        # Simple 4x oversampling for true peak detection
-        # In production, use proper upsampling filter
-        oversampled = np.interp(
-            np.linspace(0, len(data), len(data) * 4), np.arange(len(data)), data
-        )
-
-        peak = np.max(np.abs(oversampled))
-        return 20 * np.log10(max(peak, 1e-10))
-
-    def _calculate_lufs(self, audio_data: np.ndarray, sample_rate: int):
-        """Calculate LUFS values"""
-        # Simplified LUFS calculation
-        # In production, use pyloudnorm or implement full ITU-R BS.1770-4
+        # Update displays
+        self._update_displays()
 
-        # Apply K-weighting (simplified)
-        if self.weighting_modes[self.current_weighting] == "K":
-            # Basic K-weighting approximation
-            weighted = audio_data * 1.0  # Placeholder
-        else:
-            weighted = audio_data
-
-        # Calculate power
-        power = np.mean(weighted**2, axis=0)
-        lufs = -0.691 + 10 * np.log10(np.mean(power) + 1e-10)
-
-        # Update measurements
-        self.lufs_momentary = lufs
-
-        # Add to history for integrated measurement
-        self.lufs_history.append(lufs)
-        if len(self.lufs_history) > sample_rate * 3:  # 3 seconds
-            self.lufs_history.pop(0)
-            self.lufs_short = np.mean(self.lufs_history)
-
-        # Integrated (gated if enabled)
-        if self.gated and len(self.lufs_history) > 10:
-            # Simple gating at -70 LUFS
-            gated_values = [v for v in self.lufs_history if v > -70]
-            if gated_values:
-                self.lufs_integrated = np.mean(gated_values)
-        elif self.lufs_history:
-            self.lufs_integrated = np.mean(self.lufs_history)
+    def _stop_meter_thread(self):
+        """Stop the worker thread"""
+        _stop_thread(self._meter_thread)
 
     def _update_displays(self):
         """Update all meter displays"""
@@ -0,0 +1,268 @@
+"""
+OMEGA6 Audio Kernels
+Per-block DSP helpers, JIT-compiled with Numba when it is available
+"""
+
+import threading
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import numpy as np
+
+# Numba, rocket-fft, scipy.fft and the ahead-of-time kernels are imported (and the
+# JIT kernels compiled) by _load on first use, so importing this module stays cheap
+omega6_kernels: Any = None
+scipy_fft: Any = None
+
+# Compiled kernel signatures; the audio pipeline is float32 throughout
+WINDOW_BLOCK_SIGNATURE = "f8(f4[:, :], f4[:], f4[:])"
+RMS_PEAK_SIGNATURE_1D = "UniTuple(f8, 2)(f4[:])"
+RMS_PEAK_SIGNATURE_2D = "UniTuple(f8, 2)(f4[:, :])"
+# rms_peak is a general helper, so the JIT build takes float64 data as well
+RMS_PEAK_SIGNATURES_F8 = ("UniTuple(f8, 2)(f8[:])", "UniTuple(f8, 2)(f8[:, :])")
+FRAME_FEATURES_SIGNATURE = "UniTuple(f8, 2)(f4[:], f4[:], i8[:], f4[:])"
+WINDOWED_SPECTRUM_SIGNATURE = "void(f4[:], f4[:], f4[:])"
+
+
+def _window_block_loop(block, window, out):
+    """Window channel 0 of a (frames, channels) block into out and return the
+    peak absolute sample of the whole block, in one pass"""
+    peak = 0.0
+    for i in range(block.shape[0]):
+        out[i] = block[i, 0] * window[i]
+        for c in range(block.shape[1]):
+            v = abs(block[i, c])
+            if v > peak:
+                peak = v
+    return peak
+
+
+def _rms_peak_loop(x):
+    """Return the mean square and the peak absolute value of all samples of x,
+    in one pass without temporaries"""
+    if x.size == 0:
+        return 0.0, 0.0
+    total = 0.0
+    peak = 0.0
+    for v in x.flat:
+        total += v * v
+        a = abs(v)
+        if a > peak:
+            peak = a
+    return total / x.size, peak
+
+
+def _frame_features_loop(mags, freqs, edges, bands):
+    """Fill bands with the energy (sum of squared magnitudes) of the bins between
+    consecutive edges and return the total energy and the spectral centroid in Hz"""
+    energy = 0.0
+    weighted = 0.0
+    total = 0.0
+    for k in range(mags.size):
+        m = mags[k]
+        energy += m * m
+        weighted += m * freqs[k]
+        total += m
+    for b in range(bands.size):
+        s = 0.0
+        for k in range(edges[b], edges[b + 1]):
+            s += mags[k] * mags[k]
+        bands[b] = s
+    return energy, weighted / total if total > 0.0 else 0.0
+
+
+def _windowed_spectrum_loop(x, window, out):
+    """Window x and write the rfft bin magnitudes into out, in one compiled call"""
+    spectrum = np.fft.rfft(x * window)
+    for k in range(min(out.size, spectrum.size)):
+        re = spectrum[k].real
+        im = spectrum[k].imag
+        out[k] = np.sqrt(re * re + im * im)
+
+
+def _window_block_numpy(block, window, out):
+    """Window channel 0 of a (frames, channels) block into out and return the
+    peak absolute sample of the whole block"""
+    np.multiply(block[:, 0], window, out=out)
+    return float(max(block.max(), -block.min()))
+
+
+def _rms_peak_numpy(x):
+    """Return the mean square and the peak absolute value of all samples of x"""
+    if x.size == 0:
+        return 0.0, 0.0
+    flat = x.ravel()
+    return float(np.dot(flat, flat)) / flat.size, float(max(flat.max(), -flat.min()))
+
+
+def _frame_features_numpy(mags, freqs, edges, bands):
+    """Fill bands with the energy of the bins between consecutive edges and return
+    the total energy and the spectral centroid in Hz"""
+    cumulative = np.concatenate(([0.0], np.cumsum(np.square(mags, dtype=np.float64))))
+    np.subtract(cumulative[edges[1:]], cumulative[edges[:-1]], out=bands, casting="same_kind")
+    total = float(mags.sum())
+    centroid = float(np.dot(mags, freqs)) / total if total > 0.0 else 0.0
+    return float(cumulative[-1]), centroid
+
+
+def _windowed_spectrum_numpy(x, window, out):
+    """Window x and write the rfft bin magnitudes into out"""
+    np.abs(scipy_fft.rfft(x * window), out=out)
+
+
+# The ahead-of-time compiled kernels check neither types nor sizes, so their
+# wrappers coerce the inputs and validate the output buffers first
+
+
+def _float32_out(out, n: int):
+    """Check that out is a float32 array the kernel may write n values into"""
+    if not isinstance(out, np.ndarray) or out.dtype != np.float32 or out.ndim != 1:
+        raise TypeError("out must be a 1-D float32 array")
+    if out.size < n:
+        raise ValueError(f"out holds {out.size} values, {n} needed")
+    return out
+
+
+def _window_block_aot(block, window, out):
+    """window_block on the ahead-of-time compiled kernels"""
+    block = np.ascontiguousarray(block, dtype=np.float32)
+    if block.ndim != 2:
+        raise ValueError("block must be a (frames, channels) array")
+    frames = block.shape[0]
+    window = np.ascontiguousarray(window, dtype=np.float32)
+    if window.ndim != 1 or window.size < frames:
+        raise ValueError(f"window must hold at least {frames} values")
+    return omega6_kernels.window_block(block, window, _float32_out(out, frames))
+
+
+def _rms_peak_aot(x):
+    """rms_peak on the ahead-of-time compiled kernels"""
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    if x.ndim == 2:
+        return omega6_kernels.rms_peak_2d(x)
+    return omega6_kernels.rms_peak_1d(x.ravel())
+
+
+def _frame_features_aot(mags, freqs, edges, bands):
+    """frame_features on the ahead-of-time compiled kernels"""
+    mags = np.ascontiguousarray(mags, dtype=np.float32).ravel()
+    freqs = np.ascontiguousarray(freqs, dtype=np.float32).ravel()
+    edges = np.ascontiguousarray(edges, dtype=np.int64).ravel()
+    if freqs.size < mags.size:
+        raise ValueError("freqs must hold a frequency for every magnitude")
+    if edges.size < 1 or edges.min() < 0 or edges.max() > mags.size:
+        raise ValueError("band edges must index into mags")
+    # The kernel fills every slot of bands, reading one edge past each
+    if _float32_out(bands, edges.size - 1).size != edges.size - 1:
+        raise ValueError("bands must hold exactly one value per pair of edges")
+    return omega6_kernels.frame_features(mags, freqs, edges, bands)
+
+
+# The implementation picked for each kernel, see _load
+_impl: Optional[SimpleNamespace] = None
+_load_lock = threading.Lock()
+
+
+def _import_backends():
+    """Import the optional kernel backends, None for each one that is missing"""
+    try:
+        from numba import njit
+    except ImportError:
+        # Numba is optional, fall back to NumPy
+        njit = None  # type: ignore[assignment]
+
+    try:
+        # Lets Numba kernels call np.fft
+        import rocket_fft
+    except ImportError:
+        rocket_fft = None  # type: ignore[assignment]
+
+    try:
+        # Ahead-of-time compiled kernels, built by build_kernels.py
+        from . import omega6_kernels as aot  # type: ignore[attr-defined]
+    except ImportError:
+        aot = None
+
+    return njit, rocket_fft, aot
+
+
+def _load() -> SimpleNamespace:
+    """Import the optional backends and pick the fastest implementation of each kernel"""
+    global _impl, omega6_kernels, scipy_fft
+    with _load_lock:
+        if _impl is not None:
+            return _impl
+        njit, rocket_fft, aot = _import_backends()
+
+        # The explicit loops only pay off compiled; plain Python uses the NumPy
+        # versions. With explicit signatures Numba compiles (or loads from its
+        # cache) here rather than on the first call.
+        impl = SimpleNamespace()
+        if aot is not None:
+            omega6_kernels = aot
+            impl.window_block = _window_block_aot
+            impl.rms_peak = _rms_peak_aot
+            impl.frame_features = _frame_features_aot
+        elif njit is not None:
+            impl.window_block = njit(WINDOW_BLOCK_SIGNATURE, fastmath=True, cache=True)(
+                _window_block_loop
+            )
+            impl.rms_peak = njit(
+                [RMS_PEAK_SIGNATURE_1D, RMS_PEAK_SIGNATURE_2D, *RMS_PEAK_SIGNATURES_F8],
+                fastmath=True,
+                cache=True,
+            )(_rms_peak_loop)
+            impl.frame_features = njit(
+                FRAME_FEATURES_SIGNATURE, fastmath=True, cache=True, nogil=True
+            )(_frame_features_loop)
+        else:
+            impl.window_block = _window_block_numpy
+            impl.rms_peak = _rms_peak_numpy
+            impl.frame_features = _frame_features_numpy
+
+        # Fusing the window and the FFT needs Numba to know np.fft, which rocket-fft adds
+        if njit is not None and rocket_fft is not None:
+            impl.windowed_spectrum = njit(
+                WINDOWED_SPECTRUM_SIGNATURE, fastmath=True, cache=True, nogil=True
+            )(_windowed_spectrum_loop)
+        else:
+            from scipy import fft
+
+            scipy_fft = fft
+            impl.windowed_spectrum = _windowed_spectrum_numpy
+
+        _impl = impl
+        return impl
+
+
+def window_block(block, window, out):
+    """Window channel 0 of a (frames, channels) float32 block into out and return
+    the peak absolute sample of the whole block"""
+    return (_impl or _load()).window_block(block, window, out)
+
+
+def rms_peak(x):
+    """Return the mean square and the peak absolute value of all samples of x"""
+    return (_impl or _load()).rms_peak(x)
+
+
+def frame_features(mags, freqs, edges, bands):
+    """Fill bands with the energy of the bins between consecutive edges and return
+    the total energy and the spectral centroid in Hz"""
+    return (_impl or _load()).frame_features(mags, freqs, edges, bands)
+
+
+def windowed_spectrum(x, window, out):
+    """Window x and write the rfft bin magnitudes into out"""
+    (_impl or _load()).windowed_spectrum(x, window, out)
+
+
+def warm_up():
+    """Load and run the kernels once ahead of the first audio block"""
+    block = np.zeros((8, 2), dtype=np.float32)
+    window_block(block, np.ones(8, dtype=np.float32), np.empty(8, dtype=np.float32))
+    rms_peak(block)
+    rms_peak(block[:, 0])
+    mono = np.ascontiguousarray(block[:, 0])
+    frame_features(mono, mono, np.arange(3, dtype=np.int64), np.empty(2, dtype=np.float32))
+    windowed_spectrum(mono, mono, np.empty(5, dtype=np.float32))
@@ -4,7 +4,7 @@ Handles audio device enumeration and capture with PipeWire support
 """
 
 import logging
-import queue
+import sys
 import threading
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Optional, Tuple
@@ -12,8 +12,11 @@ from typing import Callable, Dict, List, Optional, Tuple
 import numpy as np
 import sounddevice as sd
 
+# Slotted dataclasses need Python 3.10; older versions fall back to a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_SLOTS)
 class AudioDevice:
     """Audio device information"""
 
@@ -24,7 +27,14 @@ class AudioDevice:
     is_input: bool
     is_output: bool
     is_default: bool = False
-    latency: str = "N/A"
+    latency_seconds: Optional[float] = None
+
+    @property
+    def latency(self) -> str:
+        """Default low input latency, formatted for display"""
+        if self.latency_seconds is None:
+            return "N/A"
+        return f"{self.latency_seconds * 1000:.1f}ms"
 
     def __str__(self):
         device_type = []
@@ -41,44 +51,78 @@ class AudioDevice:
 class AudioManager:
     """Manages audio devices and capture"""
 
-    def __init__(self):
+    # Blocks in the capture ring (power of two). A block handed to the audio
+    # callbacks is overwritten RING_SIZE blocks later, so keep a copy to hold it longer.
+    RING_SIZE = 64
+
+    def __init__(self, inline_callbacks: bool = False):
         self.logger = logging.getLogger(__name__)
         self.devices: Dict[int, AudioDevice] = {}
+        # Fingerprint of the last enumeration, see refresh_devices
+        self._devices_token: Optional[Tuple] = None
+        self._input_devices: Tuple[AudioDevice, ...] = ()
+        self._output_devices: Tuple[AudioDevice, ...] = ()
         self.current_input_device: Optional[int] = None
         self.current_output_device: Optional[int] = None
 
         # Audio capture state
         self.is_capturing = False
-        self.audio_queue = queue.Queue(maxsize=100)
         self.capture_thread: Optional[threading.Thread] = None
-        self.stream = None
+        self.stream: Optional[sd.InputStream] = None
 
         # Capture parameters
         self.sample_rate = 48000
         self.chunk_size = 512
         self.channels = 2
 
-        # Callbacks
+        # Single-producer/single-consumer ring of preallocated blocks between the
+        # audio callback and the processing thread. The callback only writes
+        # _head and _seq (the block number each slot holds) and the processing
+        # thread only writes _tail and _reading (the block it is working on), so
+        # no lock is needed.
+        self._ring: List[np.ndarray] = []
+        self._seq: List[int] = []
+        self._ring_mask = self.RING_SIZE - 1
+        self._head = 0
+        self._tail = 0
+        self._reading: Optional[int] = None
+        self._allocate_ring()
+        # Wakes the processing thread when a block is published
+        self._data_ready = threading.Event()
+
+        # Callbacks. With inline_callbacks they run directly in the audio callback,
+        # so they must be short and never block; otherwise a processing thread runs them.
         self.audio_callbacks: List[Callable] = []
+        self.inline_callbacks = inline_callbacks
+        # Immutable copy iterated per block, rebuilt on (un)register; registration
+        # from another thread never changes a tuple that is being iterated
+        self._callbacks_snapshot: Tuple[Callable, ...] = ()
 
         # Refresh devices on init
         self.refresh_devices()
 
     def refresh_devices(self) -> Dict[int, AudioDevice]:
         """Refresh and enumerate all audio devices"""
-        self.devices.clear()
-
         try:
             # Get device list from sounddevice
             devices = sd.query_devices()
             # hostapis = sd.query_hostapis()  # Currently unused
 
+            # Keep the existing devices when the list looks unchanged
+            token = self._devices_fingerprint(devices, sd.default.device)
+            if token == self._devices_token:
+                return self.devices
+            self._devices_token = token
+            self.devices.clear()
+
             # Get default devices
             default_input = sd.default.device[0]
             default_output = sd.default.device[1]
+            defaults = {default_input, default_output}
 
             self.logger.info(f"Found {len(devices)} audio devices")
 
+            pipewire_input = None
             for idx, device in enumerate(devices):
                 # Create AudioDevice object
                 audio_device = AudioDevice(
@@ -88,44 +132,67 @@ class AudioManager:
                     sample_rate=device["default_samplerate"],
                     is_input=device["max_input_channels"] > 0,
                     is_output=device["max_output_channels"] > 0,
-                    is_default=(idx == default_input or idx == default_output),
-                    latency=f"{device.get('default_low_input_latency', 0)*1000:.1f}ms",
+                    is_default=idx in defaults,
+                    latency_seconds=device.get("default_low_input_latency", 0),
                 )
 
                 self.devices[idx] = audio_device
 
-                # Log PipeWire/JACK devices specifically
-                if "pipewire" in device["name"].lower() or "jack" in device["name"].lower():
+                # Log PipeWire/JACK devices specifically, remembering the first PipeWire input
+                name = device["name"].lower()
+                if "pipewire" in name or "jack" in name:
                     self.logger.info(f"Found PipeWire/JACK device: {audio_device}")
+                    if pipewire_input is None and "pipewire" in name and audio_device.is_input:
+                        pipewire_input = idx
+
+            self._input_devices = tuple(d for d in self.devices.values() if d.is_input)
+            self._output_devices = tuple(d for d in self.devices.values() if d.is_output)
 
-            # Set defaults if not already set
-            if self.current_input_device is None:
-                # Try to find and use PipeWire device by default
-                for idx, device in self.devices.items():
-                    if "pipewire" in device.name.lower() and device.is_input:
-                        self.current_input_device = idx
-                        self.logger.info(f"Auto-selected PipeWire device: {device.name}")
-                        break
-                
-                # Fall back to system default if PipeWire not found
-                if self.current_input_device is None and default_input is not None:
-                    self.current_input_device = default_input
-                    
-            if self.current_output_device is None and default_output is not None:
-                self.current_output_device = default_output
+            self._select_default_devices(pipewire_input, default_input, default_output)
 
         except Exception as e:
             self.logger.error(f"Error enumerating devices: {e}")
 
         return self.devices
 
-    def get_input_devices(self) -> List[AudioDevice]:
-        """Get all input devices"""
-        return [d for d in self.devices.values() if d.is_input]
+    def _select_default_devices(self, pipewire_input, default_input, default_output):
+        """Set the current devices if not already set, preferring a PipeWire input"""
+        if self.current_input_device is None:
+            if pipewire_input is not None:
+                self.current_input_device = pipewire_input
+                device = self.devices[pipewire_input]
+                self.logger.info(f"Auto-selected PipeWire device: {device.name}")
+            # Fall back to system default if PipeWire not found
+            elif default_input is not None:
+                self.current_input_device = default_input
+
+        if self.current_output_device is None and default_output is not None:
+            self.current_output_device = default_output
+
+    @staticmethod
+    def _devices_fingerprint(devices, default_device) -> Tuple:
+        """Every device field refresh_devices reads, plus the default devices"""
+        return (
+            tuple(default_device),
+            tuple(
+                (
+                    device["name"],
+                    device["max_input_channels"],
+                    device["max_output_channels"],
+                    device["default_samplerate"],
+                    device.get("default_low_input_latency", 0),
+                )
+                for device in devices
+            ),
+        )
 
-    def get_output_devices(self) -> List[AudioDevice]:
-        """Get all output devices"""
-        return [d for d in self.devices.values() if d.is_output]
+    def get_input_devices(self) -> Tuple[AudioDevice, ...]:
+        """Get all input devices (as of the last refresh)"""
+        return self._input_devices
+
+    def get_output_devices(self) -> Tuple[AudioDevice, ...]:
+        """Get all output devices (as of the last refresh)"""
+        return self._output_devices
 
     def get_all_devices(self) -> List[AudioDevice]:
         """Get all devices (input and output)"""
@@ -171,12 +238,16 @@ class AudioManager:
             # Get device info
             device = self.devices[self.current_input_device]
 
+            # Match the ring blocks to the stream format
+            self._allocate_ring()
+
             # Configure stream
             self.stream = sd.InputStream(
                 device=self.current_input_device,
                 channels=self.channels,
                 samplerate=self.sample_rate,
                 blocksize=self.chunk_size,
+                dtype="float32",
                 callback=self._audio_callback,
                 latency="low",
             )
@@ -188,9 +259,10 @@ class AudioManager:
             self.logger.info(f"Started capture from: {device.name}")
 
             # Start processing thread
-            self.capture_thread = threading.Thread(target=self._process_audio_queue)
-            self.capture_thread.daemon = True
-            self.capture_thread.start()
+            if not self.inline_callbacks:
+                self.capture_thread = threading.Thread(target=self._process_audio_queue)
+                self.capture_thread.daemon = True
+                self.capture_thread.start()
 
             return True
 
@@ -204,88 +276,132 @@ class AudioManager:
             return
 
         self.is_capturing = False
+        self._data_ready.set()
 
         if self.stream:
             self.stream.stop()
             self.stream.close()
             self.stream = None
 
-        # Clear queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Let the processing thread finish, then drop unprocessed blocks by
+        # rewinding the ring to its empty start state
+        if self.capture_thread is not None:
+            self.capture_thread.join(timeout=1.0)
+            self.capture_thread = None
+        self._head = self._tail = 0
+        self._reading = None
 
         self.logger.info("Stopped audio capture")
 
+    def _allocate_ring(self):
+        """Preallocate the capture ring blocks for the current stream format"""
+        shape = (self.chunk_size, self.channels)
+        if self._ring and self._ring[0].shape == shape:
+            return
+        self._ring = [np.empty(shape, dtype=np.float32) for _ in range(self.RING_SIZE)]
+        self._seq = [-1] * self.RING_SIZE
+        self._head = 0
+        self._tail = 0
+        self._reading = None
+
     def _audio_callback(self, indata, frames, time_info, status):
         """Callback for audio stream"""
         if status:
             self.logger.warning(f"Audio callback status: {status}")
 
-        # Put data in queue for processing
-        try:
-            self.audio_queue.put_nowait(indata.copy())
-        except queue.Full:
-            # Drop oldest data
-            try:
-                self.audio_queue.get_nowait()
-                self.audio_queue.put_nowait(indata.copy())
-            except Exception:
-                pass
+        # Copy into the next ring block, overwriting the oldest one when the ring is
+        # full. A slot the processing thread is still working on is left alone and
+        # its block number skipped, so the new block takes the slot after it.
+        head = self._head
+        if head - self.RING_SIZE == self._reading:
+            head += 1
+        slot = head & self._ring_mask
+        # The stream is float32 like the ring, so this is a plain memcpy
+        np.copyto(self._ring[slot], indata, casting="no")
+        self._seq[slot] = head
+
+        # Publish only after the copy is complete
+        self._head = head + 1
+
+        if self.inline_callbacks:
+            self._run_callbacks(self._ring[slot])
+            self._tail = head + 1
+        else:
+            self._data_ready.set()
 
     def _process_audio_queue(self):
-        """Process audio from queue in separate thread"""
+        """Process audio from the ring in separate thread"""
         while self.is_capturing:
-            try:
-                # Get audio data
-                audio_data = self.audio_queue.get(timeout=0.1)
-
-                # Call all registered callbacks
-                for callback in self.audio_callbacks:
-                    try:
-                        callback(audio_data, self.sample_rate)
-                    except Exception as e:
-                        self.logger.error(f"Audio callback error: {e}")
+            head = self._head
+            tail = self._tail
+            if tail == head:
+                # Sleep until the next block; the ring is checked again after the
+                # wakeup is cleared, so a block published meanwhile is not missed
+                self._data_ready.wait(timeout=0.1)
+                self._data_ready.clear()
+                continue
 
-            except queue.Empty:
+            # Skip the oldest blocks if the callback has overwritten them. While
+            # _head is h the callback may be writing over block h - RING_SIZE, so
+            # a block is intact while _head is at most RING_SIZE - 1 ahead of it.
+            tail = max(tail, head - self._ring_mask)
+            self._reading = tail
+            if self._head - tail > self._ring_mask:
+                # Overwritten before the claim was seen, take a newer block
                 continue
+            if self._seq[tail & self._ring_mask] != tail:
+                # A block number the callback skipped
+                self._tail = tail + 1
+                self._reading = None
+                continue
+
+            try:
+                # Call all registered callbacks with the oldest block
+                self._run_callbacks(self._ring[tail & self._ring_mask])
+
             except Exception as e:
                 self.logger.error(f"Audio processing error: {e}")
 
+            # Release the block to the callback
+            self._tail = tail + 1
+            self._reading = None
+
+    def _run_callbacks(self, audio_data: np.ndarray):
+        """Call all registered callbacks with one audio block"""
+        sample_rate = self.sample_rate
+        for callback in self._callbacks_snapshot:
+            try:
+                callback(audio_data, sample_rate)
+            except Exception as e:
+                self.logger.error(f"Audio callback error: {e}")
+
     def register_callback(self, callback: Callable):
         """Register a callback for audio data"""
         if callback not in self.audio_callbacks:
             self.audio_callbacks.append(callback)
+            self._callbacks_snapshot = tuple(self.audio_callbacks)
 
     def unregister_callback(self, callback: Callable):
         """Unregister an audio callback"""
         if callback in self.audio_callbacks:
             self.audio_callbacks.remove(callback)
+            self._callbacks_snapshot = tuple(self.audio_callbacks)
 
     def get_current_level(self) -> Tuple[float, float]:
         """Get current audio level (L, R) in dB"""
-        if not self.is_capturing or self.audio_queue.empty():
+        head = self._head
+        if not self.is_capturing or head == 0:
             return -100.0, -100.0
 
-        try:
-            # Peek at latest data without removing
-            audio_data = self.audio_queue.queue[-1]
-
-            # Calculate RMS
-            if audio_data.ndim == 1:
-                rms = np.sqrt(np.mean(audio_data**2))
-                return 20 * np.log10(max(rms, 1e-10)), 20 * np.log10(max(rms, 1e-10))
-            else:
-                rms_l = np.sqrt(np.mean(audio_data[:, 0] ** 2))
-                rms_r = (
-                    np.sqrt(np.mean(audio_data[:, 1] ** 2)) if audio_data.shape[1] > 1 else rms_l
-                )
-                return 20 * np.log10(max(rms_l, 1e-10)), 20 * np.log10(max(rms_r, 1e-10))
+        # Latest published block; the ring is only written by the audio callback,
+        # so this needs no lock
+        audio_data = self._ring[(head - 1) & self._ring_mask]
 
-        except Exception:
-            return -100.0, -100.0
+        # Mean square of every channel in one pass, then 10*log10 (no sqrt needed)
+        mean_square = np.einsum("ij,ij->j", audio_data, audio_data) / len(audio_data)
+        level_db = 10 * np.log10(np.maximum(mean_square, 1e-20))
+        # The last channel is the first one for mono blocks
+        return float(level_db[0]), float(level_db[-1])
 
     def list_devices_info(self) -> str:
         """Get formatted device list"""
@@ -4,9 +4,18 @@ Extends Friture with custom plugins and features
 """
 
 import logging
+import math
+from types import SimpleNamespace
 
 import numpy as np
 from PyQt5 import QtCore, QtWidgets
+from scipy import fft as scipy_fft
+
+try:
+    import pyfftw
+except ImportError:
+    # pyFFTW is optional, fall back to scipy.fft
+    pyfftw = None
 
 # Import Friture components
 try:
@@ -16,6 +25,8 @@ except ImportError as e:
     # Fallback imports or stubs
     AudioBackend = None
 
+from .audio_kernels import warm_up as warm_up_kernels
+from .audio_kernels import window_block
 from .audio_manager import AudioManager
 from .plugin_manager import PluginManager
 
@@ -26,6 +37,15 @@ class OMEGA6App(QtWidgets.QMainWindow):
     # Signal for thread-safe plugin updates
     audio_data_ready = QtCore.pyqtSignal(np.ndarray, np.ndarray, np.ndarray)
 
+    # FFT frames span several audio blocks and overlap by 50%
+    FFT_FRAME_SIZE = 2048
+    FFT_HOP_SIZE = 1024
+
+    # Magnitude buffers reused in turn (power of two). A frame is dropped while all
+    # of them are still queued for the GUI thread, so a queued one is never overwritten.
+    # (The capture ring keeps audio blocks for longer than these frames span.)
+    MAG_BUFFERS = 8
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
@@ -37,8 +57,20 @@ class OMEGA6App(QtWidgets.QMainWindow):
         # Set dark theme
         self.setStyleSheet(self._get_dark_style())
 
+        # FFT tables and frame state for _on_audio_data, see _rebuild_dsp_tables
+        self._dsp = SimpleNamespace(sample_rate=None)
+        # Spectra emitted by the audio side and handled by the GUI thread; the
+        # difference is the number of magnitude buffers still queued
+        self._mags_emitted = 0
+        self._mags_handled = 0
+
+        # Compile the audio kernels now rather than on the first audio block
+        warm_up_kernels()
+
         # Initialize audio manager
-        self.audio_manager = AudioManager()
+        # _on_audio_data is allocation-light and only queues the GUI update,
+        # so it runs directly in the audio callback
+        self.audio_manager = AudioManager(inline_callbacks=True)
         self.audio_manager.register_callback(self._on_audio_data)
 
         # Initialize plugin manager
@@ -56,7 +88,8 @@ class OMEGA6App(QtWidgets.QMainWindow):
         # Setup timers
         self._setup_timers()
 
-        # Restore settings
+        # Restore settings; the same QSettings object is reused for every save
+        self._settings = QtCore.QSettings()
         self._restore_settings()
 
     def _get_dark_style(self) -> str:
@@ -90,44 +123,110 @@ class OMEGA6App(QtWidgets.QMainWindow):
 
     def _on_audio_data(self, audio_data: np.ndarray, sample_rate: int):
         """Handle incoming audio data"""
-        # Debug: Check if we're getting audio
-        level = np.max(np.abs(audio_data))
-        if hasattr(self, '_audio_count'):
-            self._audio_count += 1
-        else:
-            self._audio_count = 0
-            
-        if self._audio_count % 50 == 0:  # Log every 50 callbacks
-            level_db = 20 * np.log10(max(level, 1e-10))
-            self.logger.info(f"Audio received: {level_db:.1f} dB, shape: {audio_data.shape}")
-        
-        # Calculate FFT
-        if audio_data.ndim > 1:
-            # Use left channel for FFT
-            channel_data = audio_data[:, 0]
+        # Plugins metering every block get it before any frame is analysed
+        self.plugin_manager.feed_audio_block(audio_data, sample_rate)
+
+        # Treat mono as a single-channel (frames, 1) block
+        block = audio_data.reshape(len(audio_data), -1)
+
+        # The tables are built on the GUI thread before capture starts (FFTW
+        # planning is far too slow for the audio callback); skip blocks until then
+        dsp = self._dsp
+        if dsp.sample_rate != sample_rate:
+            return
+
+        # Collect the left channel into overlapping FFT frames; a frame is
+        # analysed every FFT_HOP_SIZE samples rather than on every block
+        frame = dsp.frame
+        frame_size = self.FFT_FRAME_SIZE
+        keep = frame_size - self.FFT_HOP_SIZE
+        offset = 0
+        while offset < len(block):
+            pos = dsp.frame_pos
+            take = min(len(block) - offset, frame_size - pos)
+            frame[pos : pos + take, 0] = block[offset : offset + take, 0]
+            dsp.frame_pos = pos + take
+            offset += take
+
+            if dsp.frame_pos == frame_size:
+                self._process_frame(dsp, audio_data)
+
+                # The newest samples start the next frame
+                frame[:keep] = frame[frame_size - keep :]
+                dsp.frame_pos = keep
+
+    def _prepare_dsp_tables(self):
+        """Build the DSP tables for the capture sample rate, before capture (re)starts"""
+        sample_rate = self.audio_manager.sample_rate
+        if self._dsp.sample_rate != sample_rate:
+            self._rebuild_dsp_tables(sample_rate)
+
+    def _rebuild_dsp_tables(self, sample_rate: int) -> SimpleNamespace:
+        """Allocate the window, bin frequencies, FFT plan and buffers for a sample rate"""
+        # The audio path itself only computes into the storage prepared here
+        n = self.FFT_FRAME_SIZE
+        dsp = SimpleNamespace(sample_rate=sample_rate)
+        dsp.window = np.hanning(n).astype(np.float32)
+        dsp.freqs = np.fft.rfftfreq(n, 1 / sample_rate).astype(np.float32)
+        dsp.frame = np.zeros((n, 1), dtype=np.float32)
+        dsp.frame_pos = 0
+
+        if pyfftw is not None:
+            # Planned once for this size, transforming the windowed buffer in place
+            dsp.windowed = pyfftw.empty_aligned(n, dtype="float32")
+            fft_out = pyfftw.empty_aligned(n // 2 + 1, dtype="complex64")
+            dsp.fft_plan = pyfftw.FFTW(dsp.windowed, fft_out, flags=("FFTW_MEASURE",))
         else:
-            channel_data = audio_data
-            
+            dsp.windowed = np.empty(n, dtype=np.float32)
+            dsp.fft_plan = None
+
+        dsp.mags = [np.empty(n // 2 + 1, dtype=np.float32) for _ in range(self.MAG_BUFFERS)]
+
+        self._dsp = dsp
+        return dsp
+
+    def _process_frame(self, dsp: SimpleNamespace, audio_data: np.ndarray):
+        """Analyse one full FFT frame and send it to the plugins with the latest block"""
         # Apply window function
-        window = np.hanning(len(channel_data))
-        windowed_data = channel_data * window
-        
+        window_block(dsp.frame, dsp.window, dsp.windowed)
+
         # Calculate FFT
-        fft_data = np.fft.rfft(windowed_data)
-        frequencies = np.fft.rfftfreq(len(channel_data), 1 / sample_rate)
+        if dsp.fft_plan is not None:
+            fft_data = dsp.fft_plan()
+        else:
+            fft_data = scipy_fft.rfft(dsp.windowed)
+
+        # Magnitudes go into the next preallocated buffer; drop the frame if the GUI
+        # thread has fallen so far behind that this buffer is still queued
+        emitted = self._mags_emitted
+        if emitted - self._mags_handled >= self.MAG_BUFFERS:
+            return
+        magnitude = dsp.mags[emitted & (self.MAG_BUFFERS - 1)]
+        np.abs(fft_data, out=magnitude)
+        self._mags_emitted = emitted + 1
 
         # Emit signal for thread-safe plugin update
-        self.audio_data_ready.emit(audio_data, np.abs(fft_data), frequencies)
+        self.audio_data_ready.emit(audio_data, magnitude, dsp.freqs)
 
     @QtCore.pyqtSlot(np.ndarray, np.ndarray, np.ndarray)
     def _update_plugins_safe(self, audio_data: np.ndarray, fft_data: np.ndarray, frequencies: np.ndarray):
         """Update plugins safely in the main thread"""
+        # Debug: Check if we're getting audio (every 50 frames, only if INFO is logged);
+        # logged here as the file/stdout handlers block and must stay out of the callback
+        if self._mags_handled % 50 == 0 and self.logger.isEnabledFor(logging.INFO):
+            level = float(np.abs(audio_data).max()) if audio_data.size else 0.0
+            level_db = 20 * math.log10(max(level, 1e-10))
+            self.logger.info(f"Audio received: {level_db:.1f} dB, shape: {audio_data.shape}")
+
         try:
             self.plugin_manager.update_all_plugins(
                 audio_data=audio_data, fft_data=fft_data, frequencies=frequencies
             )
         except Exception as e:
             self.logger.error(f"Error updating plugins: {e}")
+        finally:
+            # Plugins copy what they keep, so the magnitude buffer can be reused now
+            self._mags_handled += 1
 
     def _create_ui(self):
         """Create the main UI layout"""
@@ -198,6 +297,7 @@ class OMEGA6App(QtWidgets.QMainWindow):
         self.input_combo.setMinimumWidth(200)
         # Populate with audio devices
         self._populate_audio_devices()
+        self.input_combo.currentIndexChanged.connect(self._on_device_changed)
         self.toolbar.addWidget(self.input_combo)
 
         self.toolbar.addSeparator()
@@ -208,38 +308,43 @@ class OMEGA6App(QtWidgets.QMainWindow):
 
     def _populate_audio_devices(self):
         """Populate audio device combo box"""
-        self.input_combo.clear()
-
-        # Group by type
-        self.input_combo.addItem("--- INPUT DEVICES ---", -1)
+        # Group by type, as (text, device index) entries
+        items = [("--- INPUT DEVICES ---", -1)]
         for device in self.audio_manager.get_input_devices():
             icon = "🎤 " if device.is_default else "   "
             display_name = str(device)
-            
+
             # Add note for PipeWire device
             if "pipewire" in device.name.lower():
                 display_name += " (All devices routed through PipeWire)"
-                
-            self.input_combo.addItem(f"{icon}{display_name}", device.index)
 
-        self.input_combo.addItem("--- OUTPUT DEVICES (Monitoring) ---", -1)
+            items.append((f"{icon}{display_name}", device.index))
+
+        items.append(("--- OUTPUT DEVICES (Monitoring) ---", -1))
         for device in self.audio_manager.get_output_devices():
             icon = "🔊 " if device.is_default else "   "
-            self.input_combo.addItem(f"{icon}{device}", device.index)
-            
-        # Add helpful note
-        self.input_combo.addItem("--- NOTE ---", -1)
-        self.input_combo.addItem("   Scarlett 2i2 accessible via pipewire device", -1)
-        self.input_combo.addItem("   Use pavucontrol or qpwgraph to route audio", -1)
+            items.append((f"{icon}{device}", device.index))
 
-        # Set current device
-        if self.audio_manager.current_input_device is not None:
-            index = self.input_combo.findData(self.audio_manager.current_input_device)
-            if index >= 0:
-                self.input_combo.setCurrentIndex(index)
+        # Add helpful note
+        items.append(("--- NOTE ---", -1))
+        items.append(("   Scarlett 2i2 accessible via pipewire device", -1))
+        items.append(("   Use pavucontrol or qpwgraph to route audio", -1))
 
-        # Connect change handler
-        self.input_combo.currentIndexChanged.connect(self._on_device_changed)
+        # Rebuild without emitting currentIndexChanged, which would switch devices
+        self.input_combo.blockSignals(True)
+        try:
+            self.input_combo.clear()
+            self.input_combo.addItems([text for text, _ in items])
+            for row, (_, device_index) in enumerate(items):
+                self.input_combo.setItemData(row, device_index)
+
+            # Set current device
+            if self.audio_manager.current_input_device is not None:
+                index = self.input_combo.findData(self.audio_manager.current_input_device)
+                if index >= 0:
+                    self.input_combo.setCurrentIndex(index)
+        finally:
+            self.input_combo.blockSignals(False)
 
     def _on_device_changed(self, index: int):
         """Handle device selection change"""
@@ -250,6 +355,7 @@ class OMEGA6App(QtWidgets.QMainWindow):
         device = self.audio_manager.devices.get(device_index)
         if device:
             if device.is_input:
+                self._prepare_dsp_tables()
                 self.audio_manager.set_input_device(device_index)
                 self.status_bar.showMessage(f"Input device: {device.name}", 3000)
             else:
@@ -370,6 +476,7 @@ class OMEGA6App(QtWidgets.QMainWindow):
         self.fps_timer.start(1000)  # Update every second
 
         # Start audio capture
+        self._prepare_dsp_tables()
         self.audio_manager.start_capture()
 
         # Add start/stop action to toolbar
@@ -400,6 +507,7 @@ class OMEGA6App(QtWidgets.QMainWindow):
     def _toggle_audio(self):
         """Toggle audio capture"""
         if self.audio_toggle.isChecked():
+            self._prepare_dsp_tables()
             self.audio_manager.start_capture()
             self.audio_toggle.setText("⏸ Stop")
             self.status_bar.showMessage("Audio capture started", 2000)
@@ -427,18 +535,16 @@ class OMEGA6App(QtWidgets.QMainWindow):
 
     def _save_layout(self):
         """Save current window layout"""
-        settings = QtCore.QSettings()
-        settings.setValue("geometry", self.saveGeometry())
-        settings.setValue("windowState", self.saveState())
+        self._settings.setValue("geometry", self.saveGeometry())
+        self._settings.setValue("windowState", self.saveState())
         self.status_bar.showMessage("Layout saved", 2000)
 
     def _restore_settings(self):
         """Restore saved settings"""
-        settings = QtCore.QSettings()
-        geometry = settings.value("geometry")
+        geometry = self._settings.value("geometry")
         if geometry:
             self.restoreGeometry(geometry)
-        state = settings.value("windowState")
+        state = self._settings.value("windowState")
         if state:
             self.restoreState(state)
 
@@ -455,8 +561,9 @@ class OMEGA6App(QtWidgets.QMainWindow):
 
     def closeEvent(self, event):
         """Handle application close"""
-        # Save settings
+        # Save settings and write them out now rather than at exit
         self._save_layout()
+        self._settings.sync()
 
         # Stop audio capture
         self.audio_manager.stop_capture()
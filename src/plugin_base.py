@@ -3,11 +3,28 @@ Base class for OMEGA6 plugins
 """
 
 import logging
+import threading
 from abc import ABCMeta, abstractmethod
-from typing import Any, Dict
+from dataclasses import dataclass
+from time import monotonic_ns
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
-from PyQt5 import QtCore, QtWidgets
+from PyQt5 import QtWidgets
+
+
+@dataclass(frozen=True)
+class FrameFeatures:
+    """Spectral features of one FFT frame, computed once and shared by all plugins"""
+
+    # Band limits in Hz; band_energy[i] covers band_edges[i] to band_edges[i + 1]
+    band_edges: Tuple[float, ...]
+    # Sum of squared magnitudes per band (read-only, shared between plugins)
+    band_energy: np.ndarray
+    # Sum of squared magnitudes over all bins
+    energy: float
+    # Magnitude-weighted mean frequency in Hz
+    centroid: float
 
 
 # Create a metaclass that combines Qt's metaclass with ABC
@@ -23,10 +40,21 @@ class PluginWidget(QtWidgets.QWidget, metaclass=PluginMeta):
     PLUGIN_VERSION = "1.0.0"
     PLUGIN_DESCRIPTION = "Base plugin class"
 
+    # Run update_fft on a thread pool worker instead of the GUI thread. process_fft
+    # must then only compute (no Qt calls); GUI code that changes state it uses
+    # takes fft_lock, and painting happens from the GUI thread (e.g. a timer).
+    THREADED_FFT = False
+
+    # Also get every capture block, in order and unthrottled, through process_block
+    AUDIO_BLOCKS = False
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.logger = logging.getLogger(f"{__name__}.{self.PLUGIN_NAME}")
 
+        # Held while process_fft runs
+        self.fft_lock = threading.Lock()
+
         # Audio data
         self.sample_rate = 48000
         self.fft_size = 2048
@@ -35,7 +63,7 @@ class PluginWidget(QtWidgets.QWidget, metaclass=PluginMeta):
 
         # Update rate control
         self.update_interval = 50  # ms
-        self.last_update = 0
+        self.last_update = 0  # monotonic_ns() of the last processed block
 
         # Initialize UI
         self._init_ui()
@@ -92,9 +120,28 @@ class PluginWidget(QtWidgets.QWidget, metaclass=PluginMeta):
         """Process incoming audio data"""
         pass
 
-    @abstractmethod
     def process_fft(self, fft_data: np.ndarray, frequencies: np.ndarray):
-        """Process FFT data"""
+        """Process FFT data.
+
+        fft_data is the real-input FFT (rfft, n // 2 + 1 bins) of a Hann-windowed
+        frame, as magnitudes or complex values; frequencies are the matching
+        rfftfreq bin centres in Hz. The caller reuses fft_data's buffer afterwards,
+        so copy anything kept past the call (self.fft_data is such a copy).
+        """
+        pass
+
+    def process_features(self, features: FrameFeatures):
+        """Process the shared per-frame features; plugins that only need band
+        energies or the centroid can override this instead of process_fft"""
+        pass
+
+    def process_block(self, audio_data: np.ndarray, sample_rate: int):
+        """Process one capture block, for AUDIO_BLOCKS plugins.
+
+        Runs on the audio thread for every block, so it must return quickly and
+        make no Qt widget calls. The capture ring reuses the block's buffer, so
+        copy anything kept past the call.
+        """
         pass
 
     def update_audio(self, audio_data: np.ndarray, sample_rate: int = 48000):
@@ -103,11 +150,11 @@ class PluginWidget(QtWidgets.QWidget, metaclass=PluginMeta):
         self.sample_rate = sample_rate
 
         # Check update rate
-        current_time = QtCore.QTime.currentTime().msecsSinceStartOfDay()
-        if current_time - self.last_update < self.update_interval:
+        now = monotonic_ns()
+        if now - self.last_update < self._update_interval_ns:
             return
 
-        self.last_update = current_time
+        self.last_update = now
 
         # Process audio
         try:
@@ -115,16 +162,43 @@ class PluginWidget(QtWidgets.QWidget, metaclass=PluginMeta):
         except Exception as e:
             self.logger.error(f"Error processing audio: {e}")
 
-    def update_fft(self, fft_data: np.ndarray, frequencies: np.ndarray):
-        """Update with new FFT data"""
-        self.fft_data = fft_data
-
+    def update_fft(
+        self,
+        fft_data: np.ndarray,
+        frequencies: np.ndarray,
+        features: Optional[FrameFeatures] = None,
+        copy: bool = True,
+    ):
+        """Update with new FFT data; copy=False hands over a copy made for this call"""
         # Process FFT
         try:
-            self.process_fft(fft_data, frequencies)
+            with self.fft_lock:
+                # Otherwise a copy in a buffer of our own, since the caller's buffer is reused
+                kept = self.fft_data
+                if not copy:
+                    self.fft_data = fft_data
+                elif kept is None or kept.shape != fft_data.shape or kept.dtype != fft_data.dtype:
+                    self.fft_data = np.array(fft_data)
+                else:
+                    np.copyto(kept, fft_data)
+
+                if features is not None:
+                    self.process_features(features)
+                self.process_fft(fft_data, frequencies)
         except Exception as e:
             self.logger.error(f"Error processing FFT: {e}")
 
+    @property
+    def update_interval(self) -> int:
+        """Minimum time between processed audio blocks in ms"""
+        return self._update_interval
+
+    @update_interval.setter
+    def update_interval(self, interval_ms: int):
+        self._update_interval = interval_ms
+        # Nanoseconds for the per-block check in update_audio
+        self._update_interval_ns = int(interval_ms * 1_000_000)
+
     def set_update_rate(self, fps: int):
         """Set plugin update rate"""
         self.update_interval = int(1000 / fps)
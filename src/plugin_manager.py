@@ -4,21 +4,90 @@ Handles plugin discovery, loading, and management
 """
 
 import importlib
-import inspect
+import json
 import logging
+import os
+import sys
+import weakref
+from functools import partial
 from pathlib import Path
-from typing import Dict, Optional, Type
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Type
 
-from .plugin_base import PluginWidget
+import numpy as np
+from PyQt5 import QtCore
+
+from .audio_kernels import frame_features
+from .plugin_base import FrameFeatures, PluginWidget
+
+# Limits of the shared feature bands in Hz: sub-bass, bass, low mids, mids,
+# upper mids, presence and brilliance
+FEATURE_BAND_EDGES = (20.0, 60.0, 250.0, 500.0, 2000.0, 4000.0, 6000.0, 20000.0)
+
+
+def _cached_import(module_name: str):
+    """Import a module, returning the already imported one without taking the import lock"""
+    modules = sys.modules
+    if module_name not in modules:
+        importlib.import_module(module_name)
+    return modules[module_name]
+
+
+class _FFTJob(QtCore.QRunnable):
+    """One FFT update of a THREADED_FFT plugin, run on a thread pool worker with
+    a copy of the frame made for it"""
+
+    def __init__(self, manager: "PluginManager", name: str, update_fft: Callable, args: tuple):
+        super().__init__()
+        self.manager = manager
+        self.name = name
+        self.update_fft = update_fft
+        self.args = args
+
+    def run(self):
+        try:
+            self.update_fft(*self.args, copy=False)
+        except Exception as e:
+            self.manager.logger.error(f"Error updating plugin {self.name}: {e}")
+        finally:
+            self.manager._fft_pending.discard(self.name)
 
 
 class PluginManager:
     """Manages OMEGA6 plugins"""
 
+    # Plugin class names per plugin directory, kept between runs so unchanged
+    # plugins are registered without scanning their module members
+    PLUGIN_CACHE_FILE = Path.home() / ".omega6" / "plugin_cache.json"
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.plugins: Dict[str, Type[PluginWidget]] = {}
+        # An instance is dropped, along with the snapshots below, once its Qt widget
+        # is destroyed (see _on_instance_destroyed)
         self.plugin_instances: Dict[str, PluginWidget] = {}
+        # Snapshots of plugin_instances for iteration, rebuilt when an instance is added
+        # or its widget is destroyed:
+        # (name, instance) pairs, (name, update_audio, update_fft, threaded fft)
+        # bound once for update_all_plugins, and (name, process_block) of the
+        # AUDIO_BLOCKS plugins for feed_audio_block
+        self._instances: Tuple[Tuple[str, PluginWidget], ...] = ()
+        self._update_targets: Tuple[Tuple[str, Callable, Callable, bool], ...] = ()
+        self._block_targets: Tuple[Tuple[str, Callable], ...] = ()
+
+        # THREADED_FFT plugins with an FFT update still running on the thread pool
+        self._fft_pending: Set[str] = set()
+        pool = QtCore.QThreadPool.globalInstance()
+        self._fft_pool = pool if pool is not None else QtCore.QThreadPool()
+
+        # Shared frame features are only computed while an instance overrides
+        # process_features; the band bin edges follow the bin frequencies
+        self._features_wanted = False
+        self._feature_edges = np.zeros(len(FEATURE_BAND_EDGES), dtype=np.int64)
+        self._feature_key = None
+
+        # Sample rate passed along with audio data to the plugins
+        self.sample_rate = 48000
 
         # Plugin search paths
         self.plugin_paths = [
@@ -26,14 +95,23 @@ class PluginManager:
             Path.home() / ".omega6" / "plugins",  # User plugins
         ]
 
+        # {plugin dir: {"mtime_ns": newest source mtime, "classes": [attribute names]}}
+        self._plugin_cache: Dict[str, Dict] = {}
+        self._plugin_cache_dirty = False
+
+        # Plugin parent directories already put on sys.path
+        self._path_set: Set[str] = set()
+
     def discover_plugins(self):
         """Discover and load all available plugins"""
         self.logger.info("Discovering plugins...")
+        self._load_plugin_cache()
 
         for plugin_path in self.plugin_paths:
             if plugin_path.exists():
                 self._scan_plugin_directory(plugin_path)
 
+        self._save_plugin_cache()
         self.logger.info(f"Discovered {len(self.plugins)} plugins")
 
     def _scan_plugin_directory(self, directory: Path):
@@ -48,29 +126,95 @@ class PluginManager:
         plugin_name = plugin_dir.name
 
         try:
-            # Add plugin directory to path
-            import sys
-
-            if str(plugin_dir.parent) not in sys.path:
-                sys.path.insert(0, str(plugin_dir.parent))
+            # Add plugin directory to path, once per directory
+            parent = str(plugin_dir.parent)
+            if parent not in self._path_set:
+                self._path_set.add(parent)
+                if parent not in sys.path:
+                    sys.path.insert(0, parent)
 
             # Import the module
-            module = importlib.import_module(plugin_name)
+            module = _cached_import(plugin_name)
 
-            # Find plugin classes
-            for name, obj in inspect.getmembers(module):
-                if (
-                    inspect.isclass(obj)
-                    and issubclass(obj, PluginWidget)
-                    and obj is not PluginWidget
-                    and hasattr(obj, "PLUGIN_NAME")
-                ):
+            # Find plugin classes, by name from the cache if the sources are unchanged
+            key = str(plugin_dir)
+            mtime_ns = self._plugin_mtime_ns(plugin_dir)
+            cached = self._plugin_cache.get(key)
+            classes: Optional[List[Type[PluginWidget]]] = None
+            if cached is not None and cached.get("mtime_ns") == mtime_ns:
+                classes = self._cached_plugin_classes(module, cached.get("classes", []))
+            if classes is None:
+                names = self._find_plugin_classes(module)
+                self._plugin_cache[key] = {"mtime_ns": mtime_ns, "classes": names}
+                self._plugin_cache_dirty = True
+                classes = [getattr(module, name) for name in names]
 
-                    self.register_plugin(obj.PLUGIN_NAME, obj)
+            for obj in classes:
+                self.register_plugin(obj.PLUGIN_NAME, obj)
 
         except Exception as e:
             self.logger.error(f"Failed to load plugin {plugin_name}: {e}")
 
+    @staticmethod
+    def _is_plugin_class(obj) -> bool:
+        """Check whether obj is a concrete plugin class"""
+        # Cheap class check first; plugin classes have a Qt/ABC metaclass, so
+        # isinstance(obj, type) rather than type(obj) is type
+        return (
+            isinstance(obj, type)
+            and obj is not PluginWidget
+            and issubclass(obj, PluginWidget)
+            and hasattr(obj, "PLUGIN_NAME")
+        )
+
+    def _find_plugin_classes(self, module) -> List[str]:
+        """Scan a module for plugin classes, returning their attribute names"""
+        # The module namespace directly: no sorted copy and no getattr per member
+        return [name for name, obj in vars(module).items() if self._is_plugin_class(obj)]
+
+    def _cached_plugin_classes(
+        self, module, names: List[str]
+    ) -> Optional[List[Type[PluginWidget]]]:
+        """Look up cached plugin class names, or None if any of them is gone"""
+        classes: List[Any] = [getattr(module, name, None) for name in names]
+        if all(self._is_plugin_class(obj) for obj in classes):
+            return classes
+        return None
+
+    @staticmethod
+    def _plugin_mtime_ns(plugin_dir: Path) -> int:
+        """Newest modification time of a plugin directory and its Python sources"""
+        # Editing a file does not touch the directory mtime, so include the files
+        mtimes = [plugin_dir.stat().st_mtime_ns]
+        mtimes.extend(path.stat().st_mtime_ns for path in plugin_dir.glob("*.py"))
+        return max(mtimes)
+
+    def _load_plugin_cache(self):
+        """Read the plugin class cache from disk"""
+        try:
+            with open(self.PLUGIN_CACHE_FILE, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        self._plugin_cache = cache if isinstance(cache, dict) else {}
+        self._plugin_cache_dirty = False
+
+    def _save_plugin_cache(self):
+        """Write the plugin class cache to disk if it changed"""
+        if not self._plugin_cache_dirty:
+            return
+
+        # Write to a temporary file first so the cache is never left half-written
+        tmp_path = self.PLUGIN_CACHE_FILE.with_suffix(".tmp")
+        try:
+            self.PLUGIN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._plugin_cache, f, indent=2)
+            os.replace(tmp_path, self.PLUGIN_CACHE_FILE)
+            self._plugin_cache_dirty = False
+        except OSError as e:
+            self.logger.warning(f"Could not save plugin cache: {e}")
+
     def register_plugin(self, name: str, plugin_class: Type[PluginWidget]):
         """Register a plugin class"""
         if name in self.plugins:
@@ -88,22 +232,53 @@ class PluginManager:
         try:
             instance = self.plugins[name]()
             self.plugin_instances[name] = instance
+            instance.destroyed.connect(
+                partial(self._on_instance_destroyed, name, weakref.ref(instance))
+            )
+            self._rebuild_snapshots()
             return instance
         except Exception as e:
             self.logger.error(f"Failed to create plugin instance {name}: {e}")
             return None
 
-    def get_plugins(self) -> Dict[str, Type[PluginWidget]]:
-        """Get all registered plugins"""
-        return self.plugins.copy()
+    def _rebuild_snapshots(self):
+        """Rebuild the iteration snapshots after plugin_instances changed"""
+        self._instances = tuple(self.plugin_instances.items())
+        self._update_targets = tuple(
+            (plugin_name, plugin.update_audio, plugin.update_fft, plugin.THREADED_FFT)
+            for plugin_name, plugin in self._instances
+        )
+        self._block_targets = tuple(
+            (plugin_name, plugin.process_block)
+            for plugin_name, plugin in self._instances
+            if plugin.AUDIO_BLOCKS
+        )
+        self._features_wanted = any(
+            type(plugin).process_features is not PluginWidget.process_features
+            for _, plugin in self._instances
+        )
+
+    def _on_instance_destroyed(self, name: str, instance_ref: weakref.ref, _obj=None):
+        """Stop updating a plugin whose Qt widget has been deleted"""
+        instance = instance_ref()
+        # The name may already belong to a newer instance
+        if instance is None or self.plugin_instances.get(name) is not instance:
+            return
+        del self.plugin_instances[name]
+        self._rebuild_snapshots()
+        self.logger.info(f"Plugin instance {name} destroyed")
+
+    def get_plugins(self) -> Mapping[str, Type[PluginWidget]]:
+        """Get all registered plugins (read-only view)"""
+        return MappingProxyType(self.plugins)
 
     def get_plugin_instance(self, name: str) -> Optional[PluginWidget]:
         """Get a plugin instance"""
         return self.plugin_instances.get(name)
 
-    def get_all_instances(self) -> Dict[str, PluginWidget]:
-        """Get all plugin instances"""
-        return self.plugin_instances.copy()
+    def get_all_instances(self) -> Mapping[str, PluginWidget]:
+        """Get all plugin instances (read-only view)"""
+        return MappingProxyType(self.plugin_instances)
 
     def update_all_plugins(self, audio_data=None, fft_data=None, frequencies=None):
         """Update all active plugins with new data"""
@@ -111,19 +286,65 @@ class PluginManager:
             self.logger.warning("No plugin instances to update!")
             return
             
-        for name, instance in self.plugin_instances.items():
+        sample_rate = self.sample_rate
+        has_audio = audio_data is not None
+        has_fft = fft_data is not None and frequencies is not None
+        features = None
+        if has_fft and self._features_wanted:
+            features = self._compute_features(fft_data, frequencies)
+        for name, update_audio, update_fft, threaded_fft in self._update_targets:
             try:
-                if audio_data is not None:
-                    instance.update_audio(audio_data, self.sample_rate if hasattr(self, 'sample_rate') else 48000)
-                if fft_data is not None and frequencies is not None:
-                    instance.update_fft(fft_data, frequencies)
+                if has_audio:
+                    update_audio(audio_data, sample_rate)
+                if has_fft:
+                    if threaded_fft:
+                        self._start_fft_job(name, update_fft, (fft_data, frequencies, features))
+                    else:
+                        update_fft(fft_data, frequencies, features)
             except Exception as e:
                 self.logger.error(f"Error updating plugin {name}: {e}")
 
+    def feed_audio_block(self, audio_data: np.ndarray, sample_rate: int):
+        """Pass one capture block to the AUDIO_BLOCKS plugins, on the audio thread"""
+        for name, process_block in self._block_targets:
+            try:
+                process_block(audio_data, sample_rate)
+            except Exception as e:
+                self.logger.error(f"Error passing audio block to plugin {name}: {e}")
+
+    def _compute_features(self, fft_data, frequencies) -> FrameFeatures:
+        """Band energies, total energy and centroid of a frame, in one kernel call"""
+        mags = np.abs(fft_data) if np.iscomplexobj(fft_data) else fft_data
+        mags = np.asarray(mags, dtype=np.float32)
+        freqs = np.asarray(frequencies, dtype=np.float32)
+        key = (freqs.size, float(freqs[-1]) if freqs.size else 0.0)
+        if key != self._feature_key:
+            np.copyto(self._feature_edges, np.searchsorted(freqs, FEATURE_BAND_EDGES))
+            self._feature_key = key
+
+        # A new array per frame, as threaded plugins may still be reading the last one
+        band_energy = np.empty(len(FEATURE_BAND_EDGES) - 1, dtype=np.float32)
+        energy, centroid = frame_features(mags, freqs, self._feature_edges, band_energy)
+        band_energy.flags.writeable = False
+        return FrameFeatures(FEATURE_BAND_EDGES, band_energy, energy, centroid)
+
+    def _start_fft_job(self, name: str, update_fft: Callable, args: tuple):
+        """Run a plugin FFT update on the thread pool, overlapping it with painting"""
+        # Drop the frame while the previous one is still being processed, so a
+        # slow plugin never builds up a backlog
+        if name in self._fft_pending:
+            return
+        self._fft_pending.add(name)
+        # The job may run after the caller has reused the FFT buffer, so it gets a
+        # copy, which update_fft keeps without copying again
+        fft_data, frequencies, features = args
+        job_args = (np.array(fft_data), frequencies, features)
+        self._fft_pool.start(_FFTJob(self, name, update_fft, job_args))
+
     def save_plugin_settings(self) -> Dict[str, Dict]:
         """Save settings for all plugins"""
         settings = {}
-        for name, instance in self.plugin_instances.items():
+        for name, instance in self._instances:
             try:
                 settings[name] = instance.get_settings()
             except Exception as e:
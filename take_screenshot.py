@@ -4,10 +4,78 @@ Take a screenshot of OMEGA6 for documentation
 """
 
 import os
+import shutil
 import subprocess
 import time
 from datetime import datetime
 
+try:
+    import mss
+    import mss.exception
+    import mss.tools
+except ImportError:
+    # mss is optional, fall back to gnome-screenshot
+    mss = None  # type: ignore[assignment]
+
+WINDOW_TIMEOUT = 10  # seconds
+
+
+def find_window():
+    """Wait for the OMEGA6 window to appear, returning its X11 id if xdotool can find it"""
+    if shutil.which("xdotool") is None:
+        time.sleep(3)
+        return None
+
+    deadline = time.monotonic() + WINDOW_TIMEOUT
+    while time.monotonic() < deadline:
+        result = subprocess.run(
+            ["xdotool", "search", "--onlyvisible", "--name", "OMEGA6"],
+            capture_output=True,
+            text=True,
+        )
+        window_ids = result.stdout.split()
+        if window_ids:
+            # Give the window a moment to paint its first frame
+            time.sleep(0.5)
+            return window_ids[-1]
+        time.sleep(0.1)
+    return None
+
+
+def window_region(window_id):
+    """Screen region of a window as an mss monitor dict"""
+    result = subprocess.run(
+        ["xdotool", "getwindowgeometry", "--shell", window_id],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    geometry = dict(line.split("=", 1) for line in result.stdout.split())
+    return {
+        "left": int(geometry["X"]),
+        "top": int(geometry["Y"]),
+        "width": int(geometry["WIDTH"]),
+        "height": int(geometry["HEIGHT"]),
+    }
+
+
+def take_screenshot(path, window_id):
+    """Save the OMEGA6 window (or the whole screen) as a PNG"""
+    if mss is not None:
+        # Grab in-process; the whole screen if the window could not be located
+        try:
+            with mss.mss() as sct:
+                region = window_region(window_id) if window_id else sct.monitors[0]
+                shot = sct.grab(region)
+                mss.tools.to_png(shot.rgb, shot.size, output=path)
+            return
+        except mss.exception.ScreenShotError as e:
+            # e.g. no X server to grab from under Wayland
+            print(f"mss could not grab the screen ({e}), using gnome-screenshot")
+
+    subprocess.run(["gnome-screenshot", "-f", path, "-w"])
+
+
 # Start OMEGA6 in background
 print("Starting OMEGA6...")
 process = subprocess.Popen(
@@ -15,14 +83,14 @@ process = subprocess.Popen(
 )
 
 # Wait for it to start
-time.sleep(3)
+window_id = find_window()
 
 # Take screenshot
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 screenshot_file = f"omega6_screenshot_{timestamp}.png"
 
 print(f"Taking screenshot: {screenshot_file}")
-subprocess.run(["gnome-screenshot", "-f", screenshot_file, "-w"])
+take_screenshot(screenshot_file, window_id)
 
 # Kill the process
 process.terminate()
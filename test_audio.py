@@ -8,6 +8,7 @@ import sys
 
 sys.path.append(os.path.dirname(__file__))
 
+import math
 import time
 
 import numpy as np
@@ -51,7 +52,8 @@ def test_audio_capture():
     captured_data = []
 
     def audio_callback(data, sample_rate):
-        captured_data.append((data, sample_rate))
+        # The manager reuses its capture blocks, so keep a copy
+        captured_data.append((data.copy(), sample_rate))
         if len(captured_data) == 1:
             print(f"Receiving audio: {data.shape} @ {sample_rate}Hz")
 
@@ -77,9 +79,13 @@ def test_audio_capture():
             print(f"Audio format: {first_chunk.shape}")
             print(f"Sample rate: {captured_data[0][1]} Hz")
 
-            # Check signal
-            all_data = np.concatenate([chunk[0] for chunk in captured_data[:10]])
-            rms = np.sqrt(np.mean(all_data**2))
+            # Check signal, summing squares chunk by chunk without temporaries
+            total_sq = 0.0
+            total_n = 0
+            for chunk, _ in captured_data[:10]:
+                total_sq += float(np.einsum("ij,ij->", chunk, chunk))
+                total_n += chunk.size
+            rms = math.sqrt(total_sq / max(total_n, 1))
             print(f"RMS level: {20*np.log10(max(rms, 1e-10)):.1f} dB")
 
             return True
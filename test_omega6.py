@@ -14,15 +14,33 @@ import logging
 import numpy as np
 from PyQt5 import QtCore, QtWidgets
 
+# Test tone for the plugin tests, computed once at import:
+# 0.1 s of a 1 kHz sine at 48 kHz, amplitude 0.5, right channel at 80%
+_SAMPLE_RATE = 48000
+_T = np.linspace(0, 0.1, 4800, dtype=np.float32)
+_TONE_1KHZ_48K = (0.5 * np.sin(2 * np.pi * 1000 * _T)).astype(np.float32)
+_STEREO_TONE = np.empty((_T.size, 2), dtype=np.float32)
+_STEREO_TONE[:, 0] = _TONE_1KHZ_48K
+np.multiply(_TONE_1KHZ_48K, 0.8, out=_STEREO_TONE[:, 1])
+
+# One QApplication shared by all tests; Qt allows only one per process
+_APP = None
+
+
+def _get_app():
+    """Get the shared QApplication, creating it on first use"""
+    global _APP
+    if _APP is None:
+        _APP = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    return _APP
+
 
 def test_plugin_system():
     """Test the plugin system"""
     print("Testing OMEGA6 Plugin System...")
 
     # Create QApplication first (required for widgets)
-    app = QtWidgets.QApplication.instance()
-    if app is None:
-        app = QtWidgets.QApplication(sys.argv)
+    _get_app()
 
     # Test plugin manager
     from src.plugin_manager import PluginManager
@@ -38,24 +56,90 @@ def test_plugin_system():
         print("\nTesting Studio Meters plugin...")
         widget = pm.create_plugin_instance("Studio Meters")
 
-        # Test with dummy audio data
-        sample_rate = 48000
-        duration = 0.1
-        t = np.linspace(0, duration, int(sample_rate * duration))
+        # Meter audio (1kHz stereo test tone)
+        widget.process_block(_STEREO_TONE, _SAMPLE_RATE)
+
+        print("✓ Studio Meters plugin working")
+
+    return True
 
-        # Generate test tone (1kHz sine wave)
-        frequency = 1000
-        amplitude = 0.5
-        audio_data = amplitude * np.sin(2 * np.pi * frequency * t)
 
-        # Make stereo
-        audio_data = np.column_stack((audio_data, audio_data * 0.8))
+def test_rms_peak_float64():
+    """rms_peak computes on float64 blocks as well as the float32 stream format"""
+    from src.audio_kernels import rms_peak
 
-        # Process audio
-        widget.process_audio(audio_data, sample_rate)
+    block = _STEREO_TONE[:512].astype(np.float64)
+    mean_square, peak = rms_peak(block)
+    assert np.isclose(mean_square, np.mean(block**2), rtol=1e-5)
+    assert np.isclose(peak, np.abs(block).max(), rtol=1e-5)
+
+    # Non-contiguous channel views too
+    mean_square, peak = rms_peak(block[:, 1])
+    assert np.isclose(mean_square, np.mean(block[:, 1] ** 2), rtol=1e-5)
+    assert np.isclose(peak, np.abs(block[:, 1]).max(), rtol=1e-5)
+
+    print("✓ rms_peak handles float64 blocks")
+    return True
 
-        print("✓ Studio Meters plugin working")
 
+def test_true_peak_continuous():
+    """True peak of a sine split into stream-sized blocks reads the sine amplitude"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), "plugins", "studio_meters"))
+    from meter_worker import MeterWorker
+
+    # 0.5 s of a continuous 0.5 amplitude 1 kHz sine (-6.02 dBTP) in 512-frame blocks
+    n = np.arange(_SAMPLE_RATE // 2)
+    sine = (0.5 * np.sin(2 * np.pi * 1000 * n / _SAMPLE_RATE)).astype(np.float32)
+    stereo = np.column_stack((sine, sine))
+
+    worker = MeterWorker()
+    readings = [
+        worker._calculate_true_peak(stereo[i : i + 512], _SAMPLE_RATE)
+        for i in range(0, len(stereo) - 511, 512)
+    ]
+
+    # Skip the first block, where the filter still runs in from silence
+    peaks = np.array(readings[1:])
+    expected = 20 * np.log10(0.5)
+    assert np.all(np.abs(peaks - expected) < 0.1), (peaks.min(), peaks.max())
+
+    print("✓ True peak is continuous across blocks")
+    return True
+
+
+def test_meters_every_block():
+    """The meter worker meters every queued block in order, filters running on"""
+    _get_app()
+    sys.path.append(os.path.join(os.path.dirname(__file__), "plugins", "studio_meters"))
+    from meter_worker import MeterWorker
+    from scipy import signal
+
+    # 0.5 s of a continuous 0.5 amplitude 1 kHz sine in 512-frame blocks
+    n = np.arange(_SAMPLE_RATE // 2)
+    sine = (0.5 * np.sin(2 * np.pi * 1000 * n / _SAMPLE_RATE)).astype(np.float32)
+    stereo = np.column_stack((sine, sine))
+    starts = range(0, len(stereo) - 511, 512)
+
+    worker = MeterWorker()
+    results = []
+    worker.results_ready.connect(results.append, QtCore.Qt.DirectConnection)
+    for i in starts:
+        worker.enqueue(stereo[i : i + 512], _SAMPLE_RATE)
+    worker._drain()
+
+    # Every block was metered, in order, and the readings cover all of them
+    assert worker._expected_seq == len(starts)
+    assert len(results) == 1
+    assert abs(results[0]["rms_l"] - 20 * np.log10(0.5 / np.sqrt(2))) < 0.05
+    assert abs(results[0]["true_peak_l"] - 20 * np.log10(0.5)) < 0.1
+
+    # The last block's loudness matches K-weighting the whole signal in one go
+    weighted = signal.sosfilt(worker._k_weighting_sos(_SAMPLE_RATE), stereo, axis=0)
+    last = weighted[starts[-1] : starts[-1] + 512]
+    expected = -0.691 + 10 * np.log10(np.mean(last**2) + 1e-10)
+    assert abs(results[0]["lufs_momentary"] - expected) < 1e-4
+
+    print("✓ Meters take every block in order")
     return True
 
 
@@ -63,7 +147,7 @@ def test_minimal_ui():
     """Test minimal UI without Friture"""
     print("\nTesting minimal UI...")
 
-    app = QtWidgets.QApplication(sys.argv)
+    app = _get_app()
 
     # Create simple test window
     window = QtWidgets.QMainWindow()
@@ -103,6 +187,9 @@ def main():
     # Test components
     tests = [
         ("Plugin System", test_plugin_system),
+        ("Kernels (float64)", test_rms_peak_float64),
+        ("True Peak", test_true_peak_continuous),
+        ("Meter Blocks", test_meters_every_block),
         ("Minimal UI", test_minimal_ui),
     ]
 
@@ -5,34 +5,52 @@ import sys
 import subprocess
 import time
 
+# Output goes to files, so a long run can never block on a full pipe
+STDOUT_LOG = "omega6.stdout.log"
+STDERR_LOG = "omega6.stderr.log"
+
+# Logged by omega6_main.py once the main window is shown
+READY_MESSAGE = b"OMEGA6 initialized successfully"
+STARTUP_TIMEOUT = 10  # seconds
+
+
+def wait_until_ready(proc):
+    """Wait for the ready message; False if OMEGA6 exits or the timeout passes first"""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        with open(STDOUT_LOG, "rb") as f:
+            if READY_MESSAGE in f.read():
+                return True
+        try:
+            proc.wait(timeout=0.2)
+            return False
+        except subprocess.TimeoutExpired:
+            pass
+    return proc.poll() is None
+
+
 print("Starting OMEGA6...")
-proc = subprocess.Popen(
-    [sys.executable, "omega6_main.py"],
-    stdout=subprocess.PIPE,
-    stderr=subprocess.PIPE,
-    text=True,
-    bufsize=1
-)
-
-# Let it run for a bit
-time.sleep(10)
-
-# Check if still running
-if proc.poll() is None:
-    print("OMEGA6 is running successfully!")
-    print("Process ID:", proc.pid)
-    print("\nPress Ctrl+C to stop...")
-    try:
-        proc.wait()
-    except KeyboardInterrupt:
-        proc.terminate()
-        print("\nStopping OMEGA6...")
-else:
+with open(STDOUT_LOG, "wb") as out, open(STDERR_LOG, "wb") as err:
+    proc = subprocess.Popen([sys.executable, "omega6_main.py"], stdout=out, stderr=err)
+
+    # Check if still running
+    running = wait_until_ready(proc)
+    if running:
+        print("OMEGA6 is running successfully!")
+        print("Process ID:", proc.pid)
+        print(f"Output is logged to {STDOUT_LOG} and {STDERR_LOG}")
+        print("\nPress Ctrl+C to stop...")
+        try:
+            proc.wait()
+        except KeyboardInterrupt:
+            proc.terminate()
+            print("\nStopping OMEGA6...")
+
+if not running:
     print("OMEGA6 exited with code:", proc.returncode)
-    stdout, stderr = proc.communicate()
-    if stdout:
-        print("\nSTDOUT:")
-        print(stdout)
-    if stderr:
-        print("\nSTDERR:")
-        print(stderr)
\ No newline at end of file
+    for title, path in (("STDOUT", STDOUT_LOG), ("STDERR", STDERR_LOG)):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            output = f.read()
+        if output:
+            print(f"\n{title}:")
+            print(output)
@@ -3,30 +3,53 @@
 
 import sys
 import numpy as np
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
 import pyqtgraph as pg
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # type: ignore[assignment]
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def gen_bars(out):
+        """Fill out with random bar heights in [10, 80)"""
+        for i in range(out.size):
+            out[i] = np.random.rand() * 70.0 + 10.0
+else:
+    _rng = np.random.default_rng()
+
+    def gen_bars(out):
+        """Fill out with random bar heights in [10, 80)"""
+        _rng.random(out=out)
+        out *= 70.0
+        out += 10.0
+
+
 class TestSpectrum(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Test Spectrum")
         self.resize(800, 600)
-        
+
         layout = QtWidgets.QVBoxLayout()
         self.setLayout(layout)
-        
+
         # Create plot
         self.plot = pg.PlotWidget()
         self.plot.setBackground('k')
         self.plot.showGrid(x=True, y=True, alpha=0.3)
         layout.addWidget(self.plot)
-        
+
         # Test data
         n_bars = 50
         x_pos = np.linspace(0, 5, n_bars)
         widths = np.ones(n_bars) * 0.08
         heights = np.random.rand(n_bars) * 50 + 10
-        
+
         # Create bars
         self.bars = pg.BarGraphItem(
             x=x_pos,
@@ -36,21 +59,45 @@ class TestSpectrum(QtWidgets.QWidget):
             pen=None
         )
         self.plot.addItem(self.bars)
-        
+
+        # Reused for every update
+        self._bar_buf = np.empty(n_bars, dtype=np.float64)
+
+        # Bar colours from green (low) to red (high), created once
+        self._palette = [pg.mkBrush(pg.hsvColor(0.33 * (1 - i / 7))) for i in range(8)]
+
+        # Bar changes collected during an update and applied in one setOpts call,
+        # so each update repaints once
+        self._opts_kwargs = {}
+
+        # Coalesce rapid clicks into at most one update per ~16 ms frame
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(16)
+        self._update_timer.timeout.connect(self.update_bars)
+
         # Update button
         btn = QtWidgets.QPushButton("Update Bars")
-        btn.clicked.connect(self.update_bars)
+        btn.clicked.connect(self._update_timer.start)
         layout.addWidget(btn)
-        
+
     def update_bars(self):
         """Update bar heights"""
-        n_bars = 50
-        new_heights = np.random.rand(n_bars) * 70 + 10
-        self.bars.setOpts(height=new_heights)
+        new_heights = self._bar_buf
+        gen_bars(new_heights)
+        self._opts_kwargs["height"] = new_heights
+
+        # Colour each bar by its height
+        levels = ((new_heights - 10.0) * (len(self._palette) / 70.0)).astype(int)
+        self._opts_kwargs["brushes"] = [self._palette[i] for i in levels]
+
+        self.bars.setOpts(**self._opts_kwargs)
+        self._opts_kwargs.clear()
         print(f"Updated bars with heights: min={new_heights.min():.1f}, max={new_heights.max():.1f}")
 
+
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
     window = TestSpectrum()
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())